@@ -0,0 +1,72 @@
+"""
+Path helpers for Journey-Level Exam Generator
+Shared by the GUI and the headless exam engine (works for both .py and .exe)
+"""
+
+import os
+import sys
+
+
+def get_application_path():
+    """Get the directory where the application is located (works for both .py and .exe)"""
+    if getattr(sys, 'frozen', False):
+        # Running as compiled executable (both onefile and onedir)
+        return os.path.dirname(sys.executable)
+    else:
+        # Running as Python script
+        return os.path.dirname(os.path.abspath(__file__))
+
+
+def get_resource_path(relative_path):
+    """Get absolute path to resource, works for dev and for PyInstaller onefile/onedir"""
+    if getattr(sys, 'frozen', False):
+        # PyInstaller bundle
+        if hasattr(sys, '_MEIPASS'):
+            # onefile mode - temp extraction folder
+            base_path = sys._MEIPASS
+        else:
+            # onedir mode - same directory as executable
+            base_path = os.path.dirname(sys.executable)
+    else:
+        # Not running as PyInstaller bundle, use regular path
+        base_path = os.path.dirname(os.path.abspath(__file__))
+
+    return os.path.join(base_path, relative_path)
+
+
+def get_images_dir():
+    """Get the user images folder next to the application (not the PyInstaller temp folder)"""
+    return os.path.join(get_application_path(), 'images')
+
+
+def resolve_image_path(relative_path, images_dir=None):
+    """Convert relative image path to full path
+
+    This function handles both:
+    1. Bundled resources in PyInstaller (sys._MEIPASS)
+    2. User images in the working directory (where EXE is located)
+    """
+    if not relative_path:
+        return None
+    if os.path.isabs(relative_path):
+        return relative_path
+
+    # For PyInstaller, check the bundled images first (in _MEIPASS)
+    if getattr(sys, 'frozen', False):
+        bundled_path = get_resource_path(relative_path)
+        if os.path.exists(bundled_path):
+            return bundled_path
+
+    # Then try the user's working directory (where databases are)
+    full_path = os.path.join(get_application_path(), relative_path)
+    if os.path.exists(full_path):
+        return full_path
+
+    # If not found, try looking in the images folder
+    if not relative_path.startswith('images/') and not relative_path.startswith('images\\'):
+        images_path = os.path.join(images_dir or get_images_dir(), relative_path)
+        if os.path.exists(images_path):
+            return images_path
+
+    # Return the original attempt if nothing else works
+    return full_path
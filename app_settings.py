@@ -0,0 +1,33 @@
+"""
+Settings file for Journey-Level Exam Generator
+app_settings.json holds the GUI's preferences and per-site database tuning
+"""
+
+import json
+import os
+
+SETTINGS_FILE = 'app_settings.json'
+
+
+def load_app_settings():
+    """Read app_settings.json, or an empty dict if it is missing or unreadable"""
+    try:
+        if os.path.exists(SETTINGS_FILE):
+            with open(SETTINGS_FILE, 'r') as f:
+                settings = json.load(f)
+            if isinstance(settings, dict):
+                return settings
+    except Exception as e:
+        print(f"Error loading settings: {e}")
+    return {}
+
+
+def save_app_settings(updates):
+    """Write updated values to app_settings.json, keeping every other key in the file"""
+    settings = load_app_settings()
+    settings.update(updates)
+    try:
+        with open(SETTINGS_FILE, 'w') as f:
+            json.dump(settings, f, indent=2)
+    except Exception as e:
+        print(f"Error saving settings: {e}")
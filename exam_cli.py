@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Command-line exam generation for Journey-Level Exam Generator
+Runs without a display (no tkinter), e.g. from a scheduled job on a print server
+
+Example:
+    python -m exam_cli generate --mode JW --lang English --roster names.csv --out exams/
+    python -m exam_cli generate --mode JW --lang English --roster names.csv --paired --out exams/
+    python -m exam_cli bench-db --mode JW --lang English
+    python -m exam_cli report --missing
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import exam_engine
+import question_db
+
+MODE_ALIASES = {'jw': "JW", 'cw': "CW/CE", 'ce': "CW/CE", 'cw/ce': "CW/CE", 'cw-ce': "CW/CE"}
+LANGUAGE_ALIASES = {'english': "English", 'en': "English", 'spanish': "Spanish", 'es': "Spanish",
+                    'espanol': "Spanish", 'español': "Spanish"}
+
+
+def parse_mode(value):
+    """Accept JW, CW, CE or CW/CE in any case"""
+    try:
+        return MODE_ALIASES[value.strip().lower()]
+    except KeyError:
+        raise argparse.ArgumentTypeError(f"unknown mode '{value}' (use JW or CW/CE)")
+
+
+def parse_language(value):
+    """Accept English/Spanish or EN/ES in any case"""
+    try:
+        return LANGUAGE_ALIASES[value.strip().lower()]
+    except KeyError:
+        raise argparse.ArgumentTypeError(f"unknown language '{value}' (use English or Spanish)")
+
+
+def build_parser():
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(prog="exam_cli", description="Generate exams without the GUI")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="Generate tests and answer keys for a roster")
+    generate.add_argument("--mode", type=parse_mode, default="JW", help="JW or CW/CE (default: JW)")
+    generate.add_argument("--lang", type=parse_language, default="English",
+                          help="English or Spanish (default: English)")
+    generate.add_argument("--roster", help="Roster file (CSV, Excel or one name per line)")
+    generate.add_argument("--name", action="append", default=[],
+                          help="Test taker name (repeat for several; added after the roster)")
+    generate.add_argument("--out", default=".", help="Output folder for the PDFs (default: current folder)")
+    generate.add_argument("--db", help="Question database to use instead of the one for --mode/--lang")
+    generate.add_argument("--workers", type=int, default=None,
+                          help="PDF worker processes (default: one per CPU)")
+    generate.add_argument("--no-pdf", action="store_true",
+                          help="Only select questions and print the timing report")
+    generate.add_argument("--paired", action="store_true",
+                          help="Also write each exam in the other language (same questions, order and Test ID)")
+    generate.add_argument("--translated-db",
+                          help="Other-language database for --paired instead of the one for --mode")
+
+    bench = subparsers.add_parser("bench-db",
+                                  help="Time commits and scans with SQLite's defaults and the configured pragmas")
+    bench.add_argument("--mode", type=parse_mode, default="JW", help="JW or CW/CE (default: JW)")
+    bench.add_argument("--lang", type=parse_language, default="English",
+                       help="English or Spanish (default: English)")
+    bench.add_argument("--db", help="Question database to use instead of the one for --mode/--lang")
+    bench.add_argument("--commits", type=int, default=200,
+                       help="Single-question add and delete commits to time (default: 200)")
+    bench.add_argument("--scans", type=int, default=5, help="Full question bank reads to time (default: 5)")
+
+    report = subparsers.add_parser("report", help="Compare the question banks for every mode and language")
+    report.add_argument("--dir", default=".", help="Folder holding the databases (default: current folder)")
+    report.add_argument("--missing", action="store_true",
+                        help="List the English questions with no Spanish translation")
+    return parser
+
+
+def load_pool(db_path):
+    """Load the question pool of one database"""
+    conn = question_db.open_database(db_path)
+    try:
+        return exam_engine.QuestionPool.from_connection(conn)
+    finally:
+        conn.close()
+
+
+def run_generate(args):
+    """Generate exams for every name and render them to the output folder"""
+    names = exam_engine.read_roster(args.roster) if args.roster else []
+    names.extend(name.strip() for name in args.name if name.strip())
+    if not names:
+        print("Error: no test taker names (use --roster and/or --name)", file=sys.stderr)
+        return 2
+
+    db_path = args.db or os.path.join(os.getcwd(), question_db.get_database_path(args.mode, args.lang))
+    if not os.path.exists(db_path):
+        print(f"Error: database not found: {db_path}", file=sys.stderr)
+        return 2
+
+    other_language = "Spanish" if args.lang == "English" else "English"
+    if args.paired:
+        translated_db_path = args.translated_db or os.path.join(
+            os.path.dirname(os.path.abspath(db_path)), question_db.get_database_path(args.mode, other_language))
+        if not os.path.exists(translated_db_path):
+            print(f"Error: {other_language} database not found: {translated_db_path}", file=sys.stderr)
+            return 2
+
+    load_start = time.perf_counter()
+    pool = load_pool(db_path)
+    translated_pool = load_pool(translated_db_path) if args.paired else None
+    load_seconds = time.perf_counter() - load_start
+
+    if not pool.category_settings:
+        print("Error: no category settings configured in this database", file=sys.stderr)
+        return 1
+
+    if args.paired:
+        pairs, report = exam_engine.generate_paired_batch(pool, translated_pool, names)
+    else:
+        exams, report = exam_engine.generate_batch(pool, names)
+    print(exam_engine.format_batch_report(report, load_seconds))
+
+    if args.no_pdf:
+        return 0
+
+    # Imported here so a selection-only run does not load reportlab
+    import exam_pdf
+
+    def show_progress(done, total, exam_id):
+        print(f"  [{done}/{total}] Test ID {exam_id}", file=sys.stderr)
+
+    render_start = time.perf_counter()
+    exam_title = exam_engine.get_exam_title(args.mode, args.lang)
+    if args.paired:
+        tags = ("EN", "ES") if args.lang == "English" else ("ES", "EN")
+        written = exam_pdf.render_paired_batch(pairs, args.out, exam_title,
+                                               exam_engine.get_exam_title(args.mode, other_language), tags,
+                                               max_workers=args.workers, progress_callback=show_progress)
+    else:
+        written = exam_pdf.render_batch(exams, args.out, exam_title,
+                                        max_workers=args.workers, progress_callback=show_progress)
+    print(f"Rendered {len(written)} tests and answer keys to {os.path.abspath(args.out)} "
+          f"in {time.perf_counter() - render_start:.1f} s")
+    return 0
+
+
+def time_connection(db_path, settings, commits, scans):
+    """Time single-question commits and full reads on a database with the given pragmas
+
+    Adds and then deletes commits questions one commit at a time, the way the
+    GUI saves an edit. Returns (commit_ms, scan_ms): the median commit and the
+    fastest full read of the bank.
+    """
+    conn = question_db.connect(db_path, settings)
+    try:
+        category_id = question_db.get_category_id(conn, "Benchmark")
+        conn.commit()
+
+        commit_times = []
+        question_ids = []
+        for number in range(commits):
+            start = time.perf_counter()
+            cursor = conn.execute("""INSERT INTO questions (question, answer, category_id, choice_a, choice_b, content_hash)
+                                     VALUES (?, 'A', ?, 'Yes', 'No', ?)""",
+                                  (f"Benchmark question {number}", category_id, f"bench-{number}"))
+            conn.commit()
+            commit_times.append(time.perf_counter() - start)
+            question_ids.append(cursor.lastrowid)
+        for question_id in question_ids:
+            start = time.perf_counter()
+            conn.execute("DELETE FROM questions WHERE id = ?", (question_id,))
+            conn.commit()
+            commit_times.append(time.perf_counter() - start)
+
+        scan_times = []
+        for _ in range(scans):
+            start = time.perf_counter()
+            exam_engine.QuestionPool.from_connection(conn)
+            scan_times.append(time.perf_counter() - start)
+    finally:
+        conn.close()
+
+    commit_times.sort()
+    return commit_times[len(commit_times) // 2] * 1000, min(scan_times) * 1000
+
+
+def run_bench_db(args):
+    """Compare commit and scan latency of SQLite's defaults against the configured pragmas
+
+    Works on a copy placed next to the database, so the timings reflect the
+    same disk (or network share) and the question bank itself is not changed.
+    """
+    db_path = args.db or os.path.join(os.getcwd(), question_db.get_database_path(args.mode, args.lang))
+    if not os.path.exists(db_path):
+        print(f"Error: database not found: {db_path}", file=sys.stderr)
+        return 2
+    if args.commits < 1 or args.scans < 1:
+        print("Error: --commits and --scans must be at least 1", file=sys.stderr)
+        return 2
+
+    fd, bench_path = tempfile.mkstemp(suffix=".db", prefix="bench_", dir=os.path.dirname(os.path.abspath(db_path)))
+    os.close(fd)
+    try:
+        source = question_db.open_database(db_path)
+        target = sqlite3.connect(bench_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+        configured = question_db.get_connection_settings()
+        profiles = [("SQLite defaults", question_db.SQLITE_DEFAULT_SETTINGS), ("Configured", configured)]
+        print(f"Database: {db_path}")
+        print("Configured pragmas: " + ", ".join(f"{key}={value}" for key, value in configured.items()))
+        print(f"{'Profile':<18}{'Commit (median)':>18}{'Full read (best)':>20}")
+        for name, settings in profiles:
+            commit_ms, scan_ms = time_connection(bench_path, settings, args.commits, args.scans)
+            print(f"{name:<18}{commit_ms:>15.2f} ms{scan_ms:>17.1f} ms")
+    finally:
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(bench_path + suffix):
+                os.remove(bench_path + suffix)
+    return 0
+
+
+def run_report(args):
+    """Print question counts per category for every bank and how much of each mode is translated"""
+    import question_reports
+
+    conn, attached = question_reports.open_all_databases(args.dir)
+    try:
+        print(question_reports.format_category_report(question_reports.category_counts(conn, attached)))
+        for mode, english, spanish, translated in question_reports.translation_summary(conn, attached):
+            print(f"\n{mode}: {translated} of {english} English questions translated "
+                  f"({spanish} Spanish questions)")
+            if args.missing:
+                for question_id, question, category, _ in question_reports.missing_translations(conn, attached, mode):
+                    text = question if len(question) <= 70 else question[:67] + "..."
+                    print(f"  {question_id:>6}  {category}: {text}")
+    finally:
+        conn.close()
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "generate":
+        return run_generate(args)
+    if args.command == "bench-db":
+        return run_bench_db(args)
+    if args.command == "report":
+        return run_report(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Exam selection engine for Journey-Level Exam Generator
+Loads the question pool once and builds exams without touching the GUI
+"""
+
+import os
+import csv
+import random
+import time
+import uuid
+from datetime import datetime
+
+TOTAL_QUESTIONS = 50
+
+# Loaded pools keyed by database path: {path: (connection id, data_version, pool)}
+_pool_cache = {}
+
+
+class QuestionPool:
+    """In-memory snapshot of a question bank, indexed by category
+
+    Rows are stored in the same tuple layout the exam dictionaries use:
+    (question, answer, category, image_path, choice_a, choice_b, choice_c, choice_d)
+    translation_keys[i] is the translation key of rows[i] (None if it has none).
+    """
+
+    def __init__(self, rows, category_settings=None, translation_keys=None):
+        self.rows = rows
+        self.category_settings = dict(category_settings or {})
+        self.translation_keys = list(translation_keys) if translation_keys is not None else [None] * len(rows)
+
+        # Category -> list of row indices, so sampling never re-reads the database
+        self.by_category = {}
+        for index, row in enumerate(rows):
+            self.by_category.setdefault(row[2], []).append(index)
+
+    @classmethod
+    def from_connection(cls, conn):
+        """Load every question and the active category settings in two queries"""
+        cursor = conn.cursor()
+        cursor.execute("""SELECT q.question, q.answer, c.name, q.image_path, q.choice_a, q.choice_b, q.choice_c, q.choice_d,
+                                 q.translation_key
+                          FROM questions q JOIN categories c ON c.id = q.category_id ORDER BY q.id""")
+        rows = []
+        translation_keys = []
+        for row in cursor:
+            rows.append(row[:8])
+            translation_keys.append(row[8])
+
+        cursor.execute("SELECT name, percentage FROM categories WHERE percentage > 0")
+        category_settings = cursor.fetchall()
+
+        return cls(rows, category_settings, translation_keys)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def category_counts(self):
+        """Get the number of available questions per category"""
+        return {category: len(indices) for category, indices in self.by_category.items()}
+
+
+def get_question_pool(conn, db_path):
+    """Get the question pool for a database, loading it only when it is missing or stale
+
+    The cached pool is reused until invalidate_question_pool() is called for the
+    database, the connection changes, or another connection commits to the file
+    (detected through PRAGMA data_version).
+    """
+    data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    cached = _pool_cache.get(db_path)
+    if cached is not None and cached[0] == id(conn) and cached[1] == data_version:
+        return cached[2]
+
+    pool = QuestionPool.from_connection(conn)
+    _pool_cache[db_path] = (id(conn), data_version, pool)
+    return pool
+
+
+def invalidate_question_pool(db_path=None):
+    """Drop the cached pool for one database (or all of them) after questions or settings change"""
+    if db_path is None:
+        _pool_cache.clear()
+    else:
+        _pool_cache.pop(db_path, None)
+
+
+def apportion_questions(category_settings, category_counts, total_questions=TOTAL_QUESTIONS):
+    """Split the test length across categories by percentage (largest remainder method)
+
+    Percentages are treated as weights, so totals other than 100% still give a
+    full test. A category never gets more questions than it has; whatever a
+    capped category cannot supply is shared among the others in proportion to
+    their percentages. If the configured categories hold fewer questions than
+    the test needs, the counts add up to what they hold and select_questions
+    fills the rest from the other categories.
+    """
+    weights = {category: percentage for category, percentage in category_settings.items()
+               if percentage > 0 and category_counts.get(category, 0) > 0}
+    if not weights:
+        return {}
+
+    target = min(total_questions, sum(category_counts[category] for category in weights))
+    remaining_total = target
+    remaining_weight = sum(weights.values())
+
+    # Exact shares, capping categories in order of how little headroom they have.
+    # Once one category fits its share every later one does too.
+    quotas = {}
+    for category in sorted(weights, key=lambda c: category_counts[c] / weights[c]):
+        share = remaining_total * weights[category] / remaining_weight
+        if share >= category_counts[category]:
+            quotas[category] = category_counts[category]
+            remaining_total -= category_counts[category]
+            remaining_weight -= weights[category]
+        else:
+            quotas[category] = share
+
+    # Round down, then hand the leftover questions to the largest remainders
+    questions_per_category = {category: int(quota) for category, quota in quotas.items()}
+    leftover = target - sum(questions_per_category.values())
+    candidates = sorted((category for category in quotas
+                         if questions_per_category[category] < category_counts[category]),
+                        key=lambda c: (-(quotas[c] - questions_per_category[c]), -weights[c], c))
+    for category in candidates[:leftover]:
+        questions_per_category[category] += 1
+
+    return questions_per_category
+
+
+def select_question_indices(pool, questions_per_category, total_questions=TOTAL_QUESTIONS, rng=random):
+    """Pick questions for one exam from the pool in a single pass
+
+    Returns the shuffled row indices. Questions are tracked by row index,
+    so the shortfall fill draws exactly the number still needed from questions
+    not already chosen and never has to retry.
+    """
+    chosen = []
+    used = set()
+
+    for category, count in questions_per_category.items():
+        indices = pool.by_category.get(category, ())
+        # Take all available questions if category has fewer than requested
+        actual_count = min(max(count, 0), len(indices))
+        if actual_count:
+            picked = rng.sample(indices, actual_count)
+            chosen.extend(picked)
+            used.update(picked)
+
+    # If we don't have enough questions, fill from any category not used yet
+    shortage = min(total_questions, len(pool.rows)) - len(chosen)
+    if shortage > 0:
+        remaining = [index for index in range(len(pool.rows)) if index not in used]
+        chosen.extend(rng.sample(remaining, min(shortage, len(remaining))))
+
+    rng.shuffle(chosen)
+    return chosen
+
+
+def select_questions(pool, questions_per_category, total_questions=TOTAL_QUESTIONS, rng=random):
+    """Pick questions for one exam from the pool; returns the shuffled question tuples"""
+    return [pool.rows[index] for index in
+            select_question_indices(pool, questions_per_category, total_questions, rng)]
+
+
+def pair_pools(pool, translated_pool):
+    """Narrow a pool to the questions that have a translation in another language's pool
+
+    Questions are matched on translation_key. Returns (paired, translations)
+    where paired keeps pool's category settings and translations[i] is the
+    translated row for paired.rows[i].
+    """
+    translated_index = {key: index for index, key in enumerate(translated_pool.translation_keys) if key}
+    rows = []
+    keys = []
+    translations = []
+    for row, key in zip(pool.rows, pool.translation_keys):
+        if key and key in translated_index:
+            rows.append(row)
+            keys.append(key)
+            translations.append(translated_pool.rows[translated_index[key]])
+    return QuestionPool(rows, pool.category_settings, keys), translations
+
+
+def get_exam_title(mode, language="English"):
+    """Get the exam title printed on tests for a database mode and language"""
+    if mode == "CW/CE":
+        if language == "Spanish":
+            return "Examen CW/CE"
+        return "CW/CE Exam"
+    else:
+        if language == "Spanish":
+            return "Examen de Competencia de Nivel de Viaje"
+        return "Journey-Level Proficiency Exam"
+
+
+def new_test_id(existing_ids=None):
+    """Create a short 8-character test ID, avoiding any IDs already issued"""
+    while True:
+        test_id = str(uuid.uuid4())[:8].upper()
+        if not existing_ids or test_id not in existing_ids:
+            return test_id
+
+
+def build_exam(name, questions, test_id=None, date=None):
+    """Build a current_test-style exam dictionary"""
+    return {
+        'name': name,
+        'date': date or datetime.now().strftime("%B %d, %Y"),
+        'id': test_id or new_test_id(),
+        'questions': questions
+    }
+
+
+def generate_exam(pool, name, total_questions=TOTAL_QUESTIONS, rng=random, test_id=None):
+    """Generate a single exam from an already loaded pool"""
+    questions_per_category = apportion_questions(pool.category_settings, pool.category_counts(), total_questions)
+    questions = select_questions(pool, questions_per_category, total_questions, rng)
+    return build_exam(name, questions, test_id)
+
+
+def generate_batch(pool, names, total_questions=TOTAL_QUESTIONS, rng=random):
+    """Generate one exam per name from a single pool load
+
+    Returns (exams, report) where report holds the selection timing.
+    """
+    start = time.perf_counter()
+
+    # The allocation only depends on the settings, so work it out once per batch
+    questions_per_category = apportion_questions(pool.category_settings, pool.category_counts(), total_questions)
+    date = datetime.now().strftime("%B %d, %Y")
+
+    exams = []
+    issued_ids = set()
+    for name in names:
+        test_id = new_test_id(issued_ids)
+        issued_ids.add(test_id)
+        questions = select_questions(pool, questions_per_category, total_questions, rng)
+        exams.append(build_exam(name, questions, test_id, date))
+
+    elapsed = time.perf_counter() - start
+    report = {
+        'exams': len(exams),
+        'pool_size': len(pool),
+        'selection_seconds': elapsed,
+        'per_exam_ms': (elapsed / len(exams) * 1000) if exams else 0.0,
+        'short_exams': sum(1 for exam in exams if len(exam['questions']) < total_questions)
+    }
+    return exams, report
+
+
+def generate_paired_batch(pool, translated_pool, names, total_questions=TOTAL_QUESTIONS, rng=random):
+    """Generate matched exams in two languages from one selection pass per name
+
+    Questions are drawn only from those with a translation (see pair_pools),
+    using pool's category settings. Each exam and its translation share the
+    Test ID, date and question order. Returns (pairs, report) where pairs
+    holds (exam, translated_exam) tuples and report is as for generate_batch,
+    plus the number of untranslated questions left out.
+    """
+    start = time.perf_counter()
+
+    paired, translations = pair_pools(pool, translated_pool)
+    questions_per_category = apportion_questions(paired.category_settings, paired.category_counts(), total_questions)
+    date = datetime.now().strftime("%B %d, %Y")
+
+    pairs = []
+    issued_ids = set()
+    for name in names:
+        test_id = new_test_id(issued_ids)
+        issued_ids.add(test_id)
+        indices = select_question_indices(paired, questions_per_category, total_questions, rng)
+        pairs.append((build_exam(name, [paired.rows[index] for index in indices], test_id, date),
+                      build_exam(name, [translations[index] for index in indices], test_id, date)))
+
+    elapsed = time.perf_counter() - start
+    report = {
+        'exams': len(pairs),
+        'pool_size': len(paired),
+        'untranslated': len(pool) - len(paired),
+        'selection_seconds': elapsed,
+        'per_exam_ms': (elapsed / len(pairs) * 1000) if pairs else 0.0,
+        'short_exams': sum(1 for exam, _ in pairs if len(exam['questions']) < total_questions)
+    }
+    return pairs, report
+
+
+def format_batch_report(report, load_seconds=None):
+    """Format a batch timing report for display"""
+    lines = [f"Exams generated: {report['exams']}",
+             f"Questions in pool: {report['pool_size']}"]
+    if report.get('untranslated'):
+        lines.append(f"Left out (no translation): {report['untranslated']}")
+    if load_seconds is not None:
+        lines.append(f"Pool load time: {load_seconds * 1000:.1f} ms")
+    lines.append(f"Selection time: {report['selection_seconds'] * 1000:.1f} ms "
+                 f"({report['per_exam_ms']:.2f} ms per exam)")
+    if report['short_exams']:
+        lines.append(f"WARNING: {report['short_exams']} exams have fewer than {TOTAL_QUESTIONS} questions")
+    return "\n".join(lines)
+
+
+def read_roster(filepath):
+    """Read test taker names from a roster file
+
+    CSV files use a 'Name' column when present, otherwise the first column.
+    Excel files follow the same rule. Any other file is read as one name per line.
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+
+    if ext in ('.xlsx', '.xls'):
+        import pandas as pd
+        df = pd.read_excel(filepath, dtype=str)
+        column = _find_name_column(list(df.columns))
+        if column is None:
+            # No header row - every cell in the first column is a name
+            df = pd.read_excel(filepath, dtype=str, header=None)
+            column = df.columns[0]
+        values = df[column].dropna().tolist()
+    elif ext == '.csv':
+        with open(filepath, newline='', encoding='utf-8-sig') as f:
+            rows = [row for row in csv.reader(f) if row]
+        if not rows:
+            return []
+        header = [cell.strip() for cell in rows[0]]
+        column = _find_name_column(header)
+        if column is None:
+            values = [row[0] for row in rows]
+        else:
+            position = header.index(column)
+            values = [row[position] for row in rows[1:] if len(row) > position]
+    else:
+        with open(filepath, encoding='utf-8-sig') as f:
+            values = f.read().splitlines()
+
+    return [str(value).strip() for value in values if str(value).strip()]
+
+
+def _find_name_column(columns):
+    """Find the roster column holding names ('Name', 'Test Taker', ...)"""
+    for column in columns:
+        if str(column).strip().lower() in ('name', 'names', 'test taker', 'test taker name', 'apprentice'):
+            return column
+    return None
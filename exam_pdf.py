@@ -0,0 +1,527 @@
+"""
+PDF rendering for Journey-Level Exam Generator
+Writes tests and answer keys without the GUI, one exam at a time or a whole batch in parallel
+"""
+
+import os
+import re
+import threading
+from io import BytesIO
+from collections import OrderedDict
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from PIL import Image
+
+from app_paths import resolve_image_path
+
+
+class ExportCancelled(Exception):
+    """Raised when a PDF export is cancelled before the file is written"""
+
+
+class PreparedImageCache:
+    """LRU cache of question images already scaled for the PDF column
+
+    Each entry is keyed by file path, modification time and target box, and holds
+    an ImageReader over a downscaled JPEG (or PNG when the image has
+    transparency) plus the size to draw it at. Reusing the same reader lets
+    drawImage embed the image once per document as a shared XObject, and the
+    decode/scale work is done once for the test, the answer key and every exam
+    in a batch rendered by this process.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, dpi=200):
+        self.max_bytes = max_bytes
+        self.dpi = dpi
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, full_path, max_width, max_height):
+        """Get (reader, draw_width, draw_height) for an image fitted into a box in points"""
+        key = (full_path, os.path.getmtime(full_path), max_width, max_height)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[:3]
+
+        entry = self._prepare(full_path, max_width, max_height)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = entry
+                self._total_bytes += entry[3]
+                # Evict least recently used images beyond the memory bound
+                while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._total_bytes -= evicted[3]
+        return entry[:3]
+
+    def _prepare(self, full_path, max_width, max_height):
+        """Decode, scale and re-encode an image once"""
+        with Image.open(full_path) as img:
+            img_width, img_height = img.size
+
+            # Same sizing as the layout: image pixels are treated as points, never enlarged
+            scale = min(max_width / img_width, max_height / img_height, 1.0)
+            draw_width = int(img_width * scale)
+            draw_height = int(img_height * scale)
+
+            # Keep enough pixels for a sharp print at the cache DPI
+            pixel_scale = min(1.0, scale * self.dpi / 72)
+            pixel_size = (max(1, round(img_width * pixel_scale)), max(1, round(img_height * pixel_scale)))
+
+            has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+            prepared = img.convert('RGBA' if has_alpha else 'RGB')
+            if prepared.size != pixel_size:
+                prepared = prepared.resize(pixel_size, Image.LANCZOS)
+
+        data = BytesIO()
+        if has_alpha:
+            prepared.save(data, format='PNG', optimize=True)
+        else:
+            prepared.save(data, format='JPEG', quality=90)
+        data.seek(0)
+
+        # Encoded bytes plus the decoded pixels the reader keeps after the first draw
+        size = len(data.getvalue()) + pixel_size[0] * pixel_size[1] * (4 if has_alpha else 3)
+        return ImageReader(data), draw_width, draw_height, size
+
+    def clear(self):
+        """Drop every prepared image"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+
+# Shared by every PDF rendered in this process
+image_cache = PreparedImageCache()
+
+
+# Layout shared by the test and the answer key (both are drawn from one plan)
+PAGE_WIDTH, PAGE_HEIGHT = letter
+QUESTION_FONT = ("Helvetica", 11)
+LINE_HEIGHT = 14           # Baseline to baseline for question and choice lines
+QUESTION_GAP = 35          # Space between questions
+CHOICE_INDENT = 15         # Choice text starts after the answer circle
+IMAGE_MAX_HEIGHT = 100
+IMAGE_ABOVE = 5            # Gap between question text and image
+IMAGE_BELOW = 10           # Gap between image and choices
+IMAGE_NOTE_HEIGHT = 15     # Height of the note drawn when an image can't be shown
+CHOICES_GAP = 5
+BOTTOM_MARGIN = 30         # Lowest point a question block may reach
+
+# Two-column layout with moderate spacing between columns
+LEFT_COLUMN_X = 50
+RIGHT_COLUMN_X = PAGE_WIDTH / 2 + 14  # 14 points spacing between columns
+COLUMN_WIDTH = PAGE_WIDTH / 2 - 64    # Adjusted for 14-point spacing
+FIRST_PAGE_TOP = PAGE_HEIGHT - 210    # Below the header and directions
+CONTINUATION_TOP = PAGE_HEIGHT - 90   # Below the continuation title and Test ID
+
+
+class TextMeasurer:
+    """Wraps text to a width in points using real font metrics
+
+    Word widths are cached, so measuring a word the second time (in another
+    question, the answer key, or the next exam in a batch) is a dictionary lookup.
+    """
+
+    def __init__(self, font_name, font_size):
+        self.font_name = font_name
+        self.font_size = font_size
+        self._widths = {}
+        self.space_width = stringWidth(' ', font_name, font_size)
+
+    def width(self, word):
+        """Get the width of a single word in points"""
+        width = self._widths.get(word)
+        if width is None:
+            width = self._widths[word] = stringWidth(word, self.font_name, self.font_size)
+        return width
+
+    def wrap(self, text, max_width):
+        """Split text into lines that each fit within max_width"""
+        lines = []
+        current_words = []
+        current_width = 0.0
+
+        for word in text.split():
+            word_width = self.width(word)
+
+            # A single word wider than the column is broken across lines
+            while word_width > max_width and len(word) > 1:
+                if current_words:
+                    lines.append(' '.join(current_words))
+                    current_words, current_width = [], 0.0
+                cut = len(word) - 1
+                while cut > 1 and self.width(word[:cut]) > max_width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+                word_width = self.width(word)
+
+            if not current_words:
+                current_words, current_width = [word], word_width
+            elif current_width + self.space_width + word_width <= max_width:
+                current_words.append(word)
+                current_width += self.space_width + word_width
+            else:
+                lines.append(' '.join(current_words))
+                current_words, current_width = [word], word_width
+
+        if current_words:
+            lines.append(' '.join(current_words))
+        return lines or ['']
+
+
+_measurers = {}
+
+
+def get_text_measurer(font_name, font_size):
+    """Get the shared measurer (and its word width cache) for a font and size"""
+    key = (font_name, font_size)
+    if key not in _measurers:
+        _measurers[key] = TextMeasurer(font_name, font_size)
+    return _measurers[key]
+
+
+def layout_question_block(number, question_row, images_dir=None):
+    """Wrap one question and size its image, computing the block height once
+
+    Returns a dictionary with the wrapped question lines, the image (or the note
+    drawn in its place), the wrapped choices and 'height': the vertical space the
+    block's content uses, not counting the gap before the next question.
+    """
+    question, answer, category, image_path, choice_a, choice_b, choice_c, choice_d = question_row
+    measurer = get_text_measurer(*QUESTION_FONT)
+
+    block = {
+        'number': number,
+        'answer': answer,
+        'question_lines': measurer.wrap(f"{number}. {question}", COLUMN_WIDTH),
+        'image_path': image_path,
+        'image': None,
+        'image_note': None,
+        'choices': [],
+    }
+    height = len(block['question_lines']) * LINE_HEIGHT
+
+    # Image if present
+    if image_path:
+        full_image_path = resolve_image_path(image_path, images_dir)
+        if full_image_path and os.path.exists(full_image_path):
+            try:
+                # Scale image to fit column width (prepared once, reused by every PDF)
+                block['image'] = image_cache.get(full_image_path, COLUMN_WIDTH - 20, IMAGE_MAX_HEIGHT)
+                height += IMAGE_ABOVE + block['image'][2] + IMAGE_BELOW
+            except Exception as e:
+                print(f"Debug: Failed to load image {full_image_path}: {str(e)}")
+                block['image_note'] = "Error loading"
+                height += IMAGE_NOTE_HEIGHT
+        else:
+            print(f"Debug: Image path '{image_path}' not found")
+            block['image_note'] = "Not found"
+            height += IMAGE_NOTE_HEIGHT
+
+    # Multiple choice options, wrapped beside the answer circle
+    height += CHOICES_GAP
+    for choice_letter, choice_text in zip('abcd', (choice_a, choice_b, choice_c, choice_d)):
+        if choice_text:
+            lines = measurer.wrap(f"{choice_letter}. {choice_text}", COLUMN_WIDTH - CHOICE_INDENT)
+            block['choices'].append((choice_letter, lines))
+            height += len(lines) * LINE_HEIGHT
+
+    block['height'] = height
+    return block
+
+
+def layout_exam(exam, images_dir=None, cancel_event=None):
+    """Compute where every question goes, once, for both the test and its answer key
+
+    Returns a plan: {'exam': exam, 'pages': [[(x, y, block), ...], ...]} where
+    y is the baseline of the block's first line. Rendering either document from
+    the same plan guarantees the key matches the test page for page. Setting
+    cancel_event stops between questions with ExportCancelled.
+    """
+    pages = [[]]
+    left_y = right_y = FIRST_PAGE_TOP
+    use_right_column = False  # Fill the left column completely first, then the right
+
+    for number, question_row in enumerate(exam['questions'], 1):
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportCancelled()
+        block = layout_question_block(number, question_row, images_dir)
+
+        if not use_right_column and left_y - block['height'] < BOTTOM_MARGIN:
+            # Switch to right column if left column is full
+            use_right_column = True
+
+        current_y = right_y if use_right_column else left_y
+        if current_y - block['height'] < BOTTOM_MARGIN and pages[-1]:
+            # Both columns full - start a new page
+            pages.append([])
+            left_y = right_y = CONTINUATION_TOP
+            use_right_column = False
+            current_y = left_y
+
+        current_x = RIGHT_COLUMN_X if use_right_column else LEFT_COLUMN_X
+        pages[-1].append((current_x, current_y, block))
+        current_y -= block['height'] + QUESTION_GAP
+
+        if use_right_column:
+            right_y = current_y
+        else:
+            left_y = current_y
+
+    return {'exam': exam, 'pages': pages}
+
+
+def draw_question_block(c, block, x, y, answer_key=False):
+    """Draw a laid out question block with its first line at y"""
+    c.setFont(*QUESTION_FONT)
+
+    # Question text
+    for line in block['question_lines']:
+        c.drawString(x, y, line)
+        y -= LINE_HEIGHT
+
+    # Image
+    if block['image']:
+        reader, image_width, image_height = block['image']
+        img_x = x + 10
+        img_y = y - image_height - IMAGE_ABOVE
+        c.drawImage(reader, img_x, img_y, width=image_width, height=image_height)
+        y = img_y - IMAGE_BELOW
+    elif block['image_note']:
+        if answer_key:
+            c.drawString(x, y - 10, f"[Image: {os.path.basename(block['image_path'])} - {block['image_note']}]")
+        else:
+            c.drawString(x, y - 10, "[Image error]")
+        y -= IMAGE_NOTE_HEIGHT
+
+    # Choices with circles (filled for the correct answer on the key)
+    y -= CHOICES_GAP
+    for choice_letter, lines in block['choices']:
+        filled = answer_key and choice_letter == str(block['answer']).strip().lower()
+        c.circle(x + 5, y + 3, 3, fill=1 if filled else 0)
+        for line in lines:
+            c.drawString(x + CHOICE_INDENT, y, line)
+            y -= LINE_HEIGHT
+
+
+def draw_test_header(c, exam, exam_title):
+    """Draw the first page header of the test"""
+    width, height = letter
+
+    # Header - Dynamic based on database mode
+    c.setFont("Helvetica-Bold", 16)
+    title_width = c.stringWidth(exam_title, "Helvetica-Bold", 16)
+    c.drawString((width - title_width) / 2, height - 40, exam_title)
+
+    # Test ID centered below title
+    c.setFont("Helvetica-Bold", 12)
+    id_text = f"Test ID: {exam['id']}"
+    id_width = c.stringWidth(id_text, "Helvetica-Bold", 12)
+    c.drawString((width - id_width) / 2, height - 60, id_text)
+
+    # Name and Date line
+    c.setFont("Helvetica", 12)
+    name_date_line = f"Name: {exam['name']}                                          Date: {exam['date']}"
+    c.drawString(50, height - 90, name_date_line)
+
+    # Draw line under name/date
+    c.line(50, height - 95, width - 50, height - 95)
+
+    # Total Points
+    c.setFont("Helvetica", 12)
+    total_points_text = f"Total Points: {len(exam['questions'])}"
+    total_width = c.stringWidth(total_points_text, "Helvetica", 12)
+    c.drawString((width - total_width) / 2, height - 115, total_points_text)
+
+    # Directions
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(50, height - 145, "Directions:")
+    c.setFont("Helvetica", 11)
+    c.drawString(120, height - 145, "For the following questions, fill the circle")
+    c.drawString(50, height - 160, "next to the option that BEST answers the question or")
+    c.drawString(50, height - 175, "completes the statement. Show all work.")
+
+
+def draw_answer_key_header(c, exam, exam_title):
+    """Draw the first page header of the answer key"""
+    width, height = letter
+
+    # Header with dynamic exam title
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(50, height - 50, f"{exam_title} - ANSWER KEY")
+
+    c.setFont("Helvetica", 12)
+    c.drawString(50, height - 80, f"Name: {exam['name']}")
+    c.drawString(50, height - 100, f"Date: {exam['date']}")
+
+    # Answer Key ID prominently displayed
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(400, height - 80, f"Test ID: {exam['id']}")
+
+    c.setFont("Helvetica", 12)
+    c.drawString(50, height - 120, "Instructions: Correct answers are filled in.")
+
+
+def draw_continuation_header(c, exam, title_text):
+    """Draw the centered title and Test ID at the top of a continuation page"""
+    width, height = letter
+    c.setFont("Helvetica-Bold", 16)
+    title_width = c.stringWidth(title_text, "Helvetica-Bold", 16)
+    c.drawString((width - title_width) / 2, height - 40, title_text)
+
+    # Add Test ID to continuation page
+    c.setFont("Helvetica-Bold", 12)
+    id_text = f"Test ID: {exam['id']}"
+    id_width = c.stringWidth(id_text, "Helvetica-Bold", 12)
+    c.drawString((width - id_width) / 2, height - 60, id_text)
+
+
+def render_exam_pdf(filepath, plan, exam_title, answer_key=False, progress_callback=None, cancel_event=None):
+    """Draw a laid out exam as either the test or the answer key
+
+    progress_callback(page, pages) is called after each page is drawn. Setting
+    cancel_event stops between pages with ExportCancelled. Nothing is written to
+    filepath unless the whole document is drawn.
+    """
+    exam = plan['exam']
+    pages = plan['pages']
+    c = canvas.Canvas(filepath, pagesize=letter)
+
+    if answer_key:
+        draw_answer_key_header(c, exam, exam_title)
+        continuation_title = f"{exam_title} - ANSWER KEY (continued)"
+    else:
+        draw_test_header(c, exam, exam_title)
+        continuation_title = f"{exam_title} (continued)"
+
+    for page_number, placements in enumerate(pages):
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportCancelled()
+        if page_number:
+            c.showPage()
+            draw_continuation_header(c, exam, continuation_title)
+        for x, y, block in placements:
+            draw_question_block(c, block, x, y, answer_key)
+        if progress_callback:
+            progress_callback(page_number + 1, len(pages))
+
+    try:
+        c.save()
+    except Exception:
+        # Don't leave a truncated PDF behind
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        raise
+
+
+def create_answer_key_pdf(filepath, exam, exam_title, images_dir=None, plan=None):
+    """Create PDF answer key - same layout as the test but with correct answers filled in"""
+    render_exam_pdf(filepath, plan or layout_exam(exam, images_dir), exam_title, answer_key=True)
+
+
+def create_test_pdf(filepath, exam, exam_title, images_dir=None, plan=None):
+    """Create PDF file of the test"""
+    render_exam_pdf(filepath, plan or layout_exam(exam, images_dir), exam_title)
+
+
+def create_exam_pdfs(test_path, key_path, exam, exam_title, images_dir=None):
+    """Create the test and its answer key from a single layout pass"""
+    plan = layout_exam(exam, images_dir)
+    render_exam_pdf(test_path, plan, exam_title)
+    render_exam_pdf(key_path, plan, exam_title, answer_key=True)
+
+
+def safe_filename_part(text):
+    """Make a test taker name safe to use inside a file name"""
+    cleaned = re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', str(text)).strip().strip('.')
+    return cleaned or "Unnamed"
+
+
+def exam_filenames(exam, timestamp=None, language_tag=None):
+    """Get the (test, answer key) file names for an exam, matching the single-export naming
+
+    language_tag (e.g. 'ES') tells apart the versions of a paired exam, which share a Test ID.
+    """
+    timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+    name = safe_filename_part(exam['name'])
+    tag = f"_{language_tag}" if language_tag else ""
+    return (f"Test_{name}_ID{exam['id']}{tag}_{timestamp}.pdf",
+            f"AnswerKey_{name}_ID{exam['id']}{tag}_{timestamp}.pdf")
+
+
+def render_exam_files(exam, test_path, key_path, exam_title, images_dir=None):
+    """Write one exam and its answer key (runs inside a worker process)"""
+    create_exam_pdfs(test_path, key_path, exam, exam_title, images_dir)
+    return exam['id'], test_path, key_path
+
+
+def render_batch(exams, output_dir, exam_title, images_dir=None, max_workers=None,
+                 progress_callback=None, cancel_event=None):
+    """Render every exam and answer key in a batch across a process pool
+
+    progress_callback(done, total, exam_id) is called from the calling thread as
+    each exam finishes. Setting cancel_event stops queued exams from starting.
+    Returns the list of (test_path, key_path) pairs that were written.
+    """
+    return _render_jobs([(exam, exam_title, None) for exam in exams], output_dir, images_dir,
+                        max_workers, progress_callback, cancel_event)
+
+
+def render_paired_batch(pairs, output_dir, exam_title, translated_title, language_tags=('EN', 'ES'),
+                        images_dir=None, max_workers=None, progress_callback=None, cancel_event=None):
+    """Render both versions of every paired exam (see exam_engine.generate_paired_batch)
+
+    Each version gets its own title, and its file names carry its tag from
+    language_tags. Progress and the result are as for render_batch, counting
+    each version as one exam.
+    """
+    jobs = []
+    for exam, translated_exam in pairs:
+        jobs.append((exam, exam_title, language_tags[0]))
+        jobs.append((translated_exam, translated_title, language_tags[1]))
+    return _render_jobs(jobs, output_dir, images_dir, max_workers, progress_callback, cancel_event)
+
+
+def _render_jobs(jobs, output_dir, images_dir, max_workers, progress_callback, cancel_event):
+    """Render (exam, exam_title, language_tag) jobs across a process pool"""
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    total = len(jobs)
+    if not total:
+        return []
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for exam, exam_title, language_tag in jobs:
+            test_name, key_name = exam_filenames(exam, timestamp, language_tag)
+            futures.append(executor.submit(render_exam_files, exam,
+                                           os.path.join(output_dir, test_name),
+                                           os.path.join(output_dir, key_name),
+                                           exam_title, images_dir))
+
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                exam_id, test_path, key_path = future.result()
+                if progress_callback:
+                    progress_callback(done, total, exam_id)
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+        finally:
+            # On cancel or a failed exam, drop everything not yet started
+            for pending in futures:
+                pending.cancel()
+
+    # Exams already running when the loop stopped still finish before shutdown returns
+    return [future.result()[1:] for future in futures
+            if not future.cancelled() and future.exception() is None]
@@ -0,0 +1,683 @@
+"""
+Question database access for Journey-Level Exam Generator
+Database selection and schema setup shared by the GUI and the command line
+"""
+
+import os
+import queue
+import hashlib
+import sqlite3
+import threading
+
+from app_paths import get_images_dir
+from app_settings import load_app_settings
+
+# Database file for each (mode, language) combination
+DATABASE_FILES = {
+    ("JW", "English"): 'test_questions.db',  # Original JW English database
+    ("JW", "Spanish"): 'test_questions_spanish.db',
+    ("CW/CE", "English"): 'cw_questions.db',
+    ("CW/CE", "Spanish"): 'cw_questions_spanish.db',
+}
+
+
+def get_database_path(mode, language):
+    """Get the database path for a mode and language combination"""
+    if mode != "JW":
+        mode = "CW/CE"
+    if language != "English":
+        language = "Spanish"
+    return DATABASE_FILES[(mode, language)]
+
+
+# Connection pragmas. Any of them can be overridden for a site under "database"
+# in app_settings.json, e.g. {"database": {"journal_mode": "DELETE"}} where the
+# bank is on a network share (WAL needs shared memory, which network file
+# systems don't provide, so mmap_size_mb should be 0 there too).
+CONNECTION_SETTINGS = {
+    'journal_mode': 'WAL',       # Readers and the writer don't block each other; commits append to the log
+    'synchronous': 'NORMAL',     # In WAL mode only checkpoints wait for the disk
+    'cache_size_kb': 16384,
+    'mmap_size_mb': 64,
+    'temp_store': 'MEMORY',      # Sorts and temporary indexes stay off the disk
+}
+
+# What a plain sqlite3.connect() gets, for comparison (see exam_cli bench-db)
+SQLITE_DEFAULT_SETTINGS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'cache_size_kb': 2000,
+    'mmap_size_mb': 0,
+    'temp_store': 'DEFAULT',
+}
+
+PRAGMA_CHOICES = {
+    'journal_mode': ('DELETE', 'TRUNCATE', 'PERSIST', 'WAL'),
+    'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA'),
+    'temp_store': ('DEFAULT', 'FILE', 'MEMORY'),
+}
+
+
+def get_connection_settings():
+    """Get the connection pragmas: CONNECTION_SETTINGS with this site's overrides
+
+    Unknown keys and invalid values in app_settings.json are reported and ignored.
+    """
+    settings = dict(CONNECTION_SETTINGS)
+    overrides = load_app_settings().get('database', {})
+    if not isinstance(overrides, dict):
+        print("Ignoring database settings: expected an object")
+        return settings
+
+    for key, value in overrides.items():
+        if key not in settings:
+            print(f"Ignoring unknown database setting '{key}'")
+        elif key in PRAGMA_CHOICES:
+            if str(value).upper() in PRAGMA_CHOICES[key]:
+                settings[key] = str(value).upper()
+            else:
+                print(f"Ignoring database setting {key}={value!r} (use one of {', '.join(PRAGMA_CHOICES[key])})")
+        elif isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+            settings[key] = value
+        else:
+            print(f"Ignoring database setting {key}={value!r} (expected a whole number)")
+    return settings
+
+
+def connect(db_path, settings=None):
+    """Open a connection to a question database with the connection pragmas applied
+
+    settings defaults to get_connection_settings(). journal_mode is stored in
+    the database file, so switching it back (e.g. to DELETE) takes effect the
+    next time the database is opened with no other connections.
+    """
+    if settings is None:
+        settings = get_connection_settings()
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+    # A negative cache_size is in KiB rather than pages
+    conn.execute(f"PRAGMA cache_size = -{int(settings['cache_size_kb'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size_mb']) * 1024 * 1024}")
+    conn.execute(f"PRAGMA temp_store = {settings['temp_store']}")
+    return conn
+
+
+QUESTIONS_TABLE_SQL = '''
+    CREATE TABLE {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        question TEXT NOT NULL,
+        answer TEXT NOT NULL,
+        category_id INTEGER NOT NULL REFERENCES categories(id),
+        choice_a TEXT DEFAULT NULL,
+        choice_b TEXT DEFAULT NULL,
+        choice_c TEXT DEFAULT NULL,
+        choice_d TEXT DEFAULT NULL,
+        image_path TEXT DEFAULT NULL,
+        image_original_path TEXT DEFAULT NULL,
+        content_hash TEXT DEFAULT NULL,
+        created_date TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+# questions columns other than the category, in table order
+QUESTION_COLUMNS = ['id', 'question', 'answer', 'choice_a', 'choice_b', 'choice_c', 'choice_d',
+                    'image_path', 'image_original_path', 'content_hash', 'created_date']
+
+
+def create_tables(conn):
+    """Create the questions and categories tables, or add columns older databases lack"""
+    # Categories, with the percentage of each test drawn from them
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            percentage INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    if not table_exists(conn, 'questions'):
+        conn.execute(QUESTIONS_TABLE_SQL.format(name='questions'))
+        return
+
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(questions)")}
+    for column in ['image_path', 'choice_a', 'choice_b', 'choice_c', 'choice_d', 'image_original_path',
+                   'content_hash']:
+        if column not in existing:
+            conn.execute(f'ALTER TABLE questions ADD COLUMN {column} TEXT DEFAULT NULL')
+
+
+def migrate_to_category_table(conn):
+    """Move category names and percentages into the categories table
+
+    Databases from before the categories table keep the category name on
+    every question. Rebuilds questions with an integer category_id in place
+    of the text column, keeping every question's ID, and drops the old
+    category_settings table. Any full-text index is dropped too and rebuilt
+    by a later migration. Also adds the question_details view.
+    """
+    question_columns = [row[1] for row in conn.execute("PRAGMA table_info(questions)")]
+    if 'category' in question_columns:
+        columns = ', '.join(QUESTION_COLUMNS)
+        sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'questions'").fetchone()
+
+        conn.execute("INSERT OR IGNORE INTO categories (name) SELECT DISTINCT category FROM questions ORDER BY category")
+        if table_exists(conn, 'category_settings'):
+            # Percentages can be set for categories that no longer have questions
+            conn.execute("INSERT OR IGNORE INTO categories (name) SELECT category FROM category_settings")
+            conn.execute("""UPDATE categories SET percentage = COALESCE(
+                                (SELECT percentage FROM category_settings WHERE category = categories.name), 0)""")
+            conn.execute("DROP TABLE category_settings")
+
+        conn.execute("DROP TABLE IF EXISTS questions_fts")
+        conn.execute(QUESTIONS_TABLE_SQL.format(name='questions_new'))
+        conn.execute(f"""INSERT INTO questions_new (category_id, {columns})
+                         SELECT c.id, {', '.join('q.' + column for column in QUESTION_COLUMNS)}
+                         FROM questions q JOIN categories c ON c.name = q.category""")
+        # Dropping the old table also drops its indexes and triggers
+        conn.execute("DROP TABLE questions")
+        conn.execute("ALTER TABLE questions_new RENAME TO questions")
+        if sequence:
+            # Keep numbering after the highest ID ever issued, not the highest remaining
+            conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'questions'", sequence)
+
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_questions_category_id ON questions(category_id)')
+
+    # Questions with their category name, for reading
+    conn.execute('''
+        CREATE VIEW IF NOT EXISTS question_details AS
+        SELECT q.id, q.question, q.answer, c.name AS category, q.category_id,
+               q.choice_a, q.choice_b, q.choice_c, q.choice_d,
+               q.image_path, q.image_original_path, q.content_hash, q.created_date
+        FROM questions q JOIN categories c ON c.id = q.category_id
+    ''')
+
+
+def add_content_hashes(conn):
+    """Index the content hash of every question so duplicates can be found and refused"""
+    # One row per distinct question; rows without a hash (NULL) are not constrained
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_questions_content_hash ON questions(content_hash)')
+    backfill_content_hashes(conn)
+
+
+def add_sort_indexes(conn):
+    """Index the question list's sort columns so each page is read straight from an index
+
+    The expressions match SORT_EXPRESSIONS exactly; SQLite only uses an
+    expression index for an identical expression. Category sorts walk the
+    categories by name and each category's questions through
+    idx_questions_category_id.
+    """
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_questions_question ON questions(question COLLATE NOCASE)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_questions_answer ON questions(answer)')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_has_image ON questions((COALESCE(image_path, '') != ''))")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_created_date ON questions(COALESCE(created_date, ''))")
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_categories_name_nocase ON categories(name COLLATE NOCASE)')
+
+
+def add_translation_keys(conn):
+    """Add the key that links a question to its translation in the other language's bank
+
+    A question and its translation share a translation_key; questions
+    without one (NULL) have not been linked. question_details is recreated
+    to include it.
+    """
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(questions)")}
+    if 'translation_key' not in existing:
+        conn.execute('ALTER TABLE questions ADD COLUMN translation_key TEXT DEFAULT NULL')
+    conn.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_questions_translation_key
+                    ON questions(translation_key) WHERE translation_key IS NOT NULL''')
+
+    conn.execute('DROP VIEW IF EXISTS question_details')
+    conn.execute('''
+        CREATE VIEW question_details AS
+        SELECT q.id, q.question, q.answer, c.name AS category, q.category_id,
+               q.choice_a, q.choice_b, q.choice_c, q.choice_d,
+               q.image_path, q.image_original_path, q.content_hash, q.created_date, q.translation_key
+        FROM questions q JOIN categories c ON c.id = q.category_id
+    ''')
+
+
+def table_exists(conn, name):
+    """Check whether the database has a table (or virtual table) with this name"""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+    return row is not None
+
+
+def get_category_ids(conn, names):
+    """Get {name: category id} for category names, adding any that are new"""
+    names = list(dict.fromkeys(names))
+    conn.executemany("INSERT OR IGNORE INTO categories (name) VALUES (?)", [(name,) for name in names])
+    ids = {}
+    for start in range(0, len(names), 500):
+        chunk = names[start:start + 500]
+        placeholders = ','.join('?' * len(chunk))
+        ids.update(conn.execute(f"SELECT name, id FROM categories WHERE name IN ({placeholders})", chunk))
+    return ids
+
+
+def get_category_id(conn, name):
+    """Get the ID of a category by name, adding it if it is new"""
+    return get_category_ids(conn, [name])[name]
+
+
+def get_category_counts(conn):
+    """Get {category name: number of questions} for categories that have questions, by name"""
+    cursor = conn.execute("""SELECT c.name, COUNT(*) FROM questions q
+                             JOIN categories c ON c.id = q.category_id
+                             GROUP BY q.category_id ORDER BY c.name""")
+    return dict(cursor.fetchall())
+
+
+def get_category_percentages(conn):
+    """Get {category name: percentage} for every category"""
+    return dict(conn.execute("SELECT name, percentage FROM categories"))
+
+
+def save_category_percentages(conn, percentages):
+    """Store the percentage of each test drawn from each category (others are set to 0)"""
+    with conn:
+        conn.execute("UPDATE categories SET percentage = 0 WHERE percentage != 0")
+        conn.executemany("UPDATE categories SET percentage = ? WHERE name = ?",
+                         [(percentage, name) for name, percentage in percentages.items() if percentage > 0])
+
+
+def normalize_question_text(text):
+    """Fold case and collapse whitespace so trivially different copies compare equal"""
+    return ' '.join(str(text or '').split()).casefold()
+
+
+def question_content_hash(question, answer, choice_a, choice_b, choice_c=None, choice_d=None):
+    """Hash the parts that make a question distinct: its text, choices and answer"""
+    parts = [normalize_question_text(part) for part in (question, choice_a, choice_b, choice_c, choice_d, answer)]
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def backfill_content_hashes(conn):
+    """Hash questions stored before content hashes existed
+
+    Questions that duplicate an earlier one keep a NULL hash (UPDATE OR
+    IGNORE), so existing banks are never altered beyond the new column.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""SELECT id, question, answer, choice_a, choice_b, choice_c, choice_d
+                      FROM questions WHERE content_hash IS NULL ORDER BY id""")
+    updates = [(question_content_hash(*row[1:]), row[0]) for row in cursor.fetchall()]
+    if updates:
+        cursor.executemany("UPDATE OR IGNORE questions SET content_hash = ? WHERE id = ?", updates)
+
+
+def find_existing_values(conn, column, values):
+    """Get which of the given values of an indexed questions column are already stored"""
+    values = list(values)
+    found = set()
+    # Stay well under SQLite's limit on bound parameters
+    for start in range(0, len(values), 500):
+        chunk = values[start:start + 500]
+        placeholders = ','.join('?' * len(chunk))
+        cursor = conn.execute(f"SELECT {column} FROM questions WHERE {column} IN ({placeholders})", chunk)
+        found.update(row[0] for row in cursor)
+    return found
+
+
+def find_existing_hashes(conn, hashes):
+    """Get which of the given content hashes are already in the questions table"""
+    return find_existing_values(conn, 'content_hash', hashes)
+
+
+def find_existing_translation_keys(conn, keys):
+    """Get which of the given translation keys are already used in this bank"""
+    return find_existing_values(conn, 'translation_key', keys)
+
+
+def find_duplicate_question(conn, content_hash, exclude_id=None):
+    """Get the ID of a stored question with this content hash (other than exclude_id), or None"""
+    row = conn.execute("SELECT id FROM questions WHERE content_hash = ? AND id IS NOT ?",
+                       (content_hash, exclude_id)).fetchone()
+    return row[0] if row else None
+
+
+def find_translation_key_owner(conn, translation_key, exclude_id=None):
+    """Get the ID of the question (other than exclude_id) using a translation key, or None"""
+    row = conn.execute("SELECT id FROM questions WHERE translation_key = ? AND id IS NOT ?",
+                       (translation_key, exclude_id)).fetchone()
+    return row[0] if row else None
+
+
+# Columns covered by the full-text index, in questions_fts column order
+SEARCH_COLUMNS = ['question', 'answer', 'category', 'choice_a', 'choice_b', 'choice_c', 'choice_d']
+# bm25 weight for each of SEARCH_COLUMNS
+SEARCH_RANK = 'bm25(10.0, 1.0, 3.0, 2.0, 2.0, 2.0, 2.0)'
+
+
+def has_search_index(conn):
+    """Check whether this database has the questions_fts full-text index"""
+    return table_exists(conn, 'questions_fts')
+
+
+def init_search_index(conn):
+    """Create the FTS5 index over the question text and the triggers that keep it in sync
+
+    The index stores no copy of the text: its content comes from the
+    question_details view, which adds each question's category name. It
+    is filled from the existing questions the first time it is created.
+    Renaming a category re-indexes only that category's questions. SQLite
+    builds without FTS5 are left without an index and search falls back to LIKE.
+    """
+    if has_search_index(conn):
+        return
+
+    columns = ', '.join(SEARCH_COLUMNS)
+
+    def values(prefix, category):
+        return ', '.join(category if column == 'category' else f'{prefix}.{column}' for column in SEARCH_COLUMNS)
+
+    new_values = values('new', '(SELECT name FROM categories WHERE id = new.category_id)')
+    old_values = values('old', '(SELECT name FROM categories WHERE id = old.category_id)')
+    try:
+        conn.execute(f"""CREATE VIRTUAL TABLE questions_fts USING fts5(
+                             {columns}, content='question_details', content_rowid='id',
+                             tokenize='unicode61 remove_diacritics 2')""")
+    except sqlite3.OperationalError as e:
+        print(f"Full-text search not available, using LIKE search: {e}")
+        return
+
+    # Separate statements: executescript would commit the migration's transaction
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS questions_fts_insert AFTER INSERT ON questions BEGIN
+            INSERT INTO questions_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS questions_fts_delete AFTER DELETE ON questions BEGIN
+            INSERT INTO questions_fts(questions_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS questions_fts_update
+        AFTER UPDATE OF question, answer, category_id, choice_a, choice_b, choice_c, choice_d ON questions BEGIN
+            INSERT INTO questions_fts(questions_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO questions_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS categories_fts_rename AFTER UPDATE OF name ON categories BEGIN
+            INSERT INTO questions_fts(questions_fts, rowid, {columns})
+                SELECT 'delete', q.id, {values('q', 'old.name')} FROM questions q WHERE q.category_id = old.id;
+            INSERT INTO questions_fts(rowid, {columns})
+                SELECT q.id, {values('q', 'new.name')} FROM questions q WHERE q.category_id = new.id;
+        END""")
+    conn.execute("INSERT INTO questions_fts(questions_fts) VALUES ('rebuild')")
+    # Rank matches in the question text highest, then category, then the choices
+    conn.execute("INSERT INTO questions_fts(questions_fts, rank) VALUES ('rank', ?)", (SEARCH_RANK,))
+
+
+def build_search_query(search_term):
+    """Turn what the user typed into an FTS5 query: every word must match, each as a prefix"""
+    words = search_term.replace('"', ' ').split()
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_questions(conn, search_term, limit=None):
+    """Find questions matching every word typed, best matches first
+
+    Returns (id, question, answer, category, created_date, image_path, snippet)
+    rows. The snippet is the best matching passage with matches in [brackets].
+    Without a full-text index it falls back to a LIKE search ordered by ID
+    (snippet is None).
+    """
+    limit_sql = f" LIMIT {int(limit)}" if limit else ""
+    query = build_search_query(search_term)
+    if not query:
+        return []
+
+    if has_search_index(conn):
+        # Rank and cut inside the FTS query (ORDER BY rank uses SEARCH_RANK), so
+        # snippets are only built for the rows returned
+        cursor = conn.execute(f"""
+            SELECT q.id, q.question, q.answer, q.category, q.created_date, q.image_path, f.snippet
+            FROM (SELECT rowid, rank, snippet(questions_fts, -1, '[', ']', '...', 12) AS snippet
+                  FROM questions_fts WHERE questions_fts MATCH ?
+                  ORDER BY rank{limit_sql}) f
+            JOIN question_details q ON q.id = f.rowid
+            ORDER BY f.rank, q.id DESC
+        """, (query,))
+        return cursor.fetchall()
+
+    pattern = f"%{search_term}%"
+    conditions = ' OR '.join(f'{column} LIKE ?' for column in SEARCH_COLUMNS)
+    cursor = conn.execute(f"""
+        SELECT id, question, answer, category, created_date, image_path, NULL
+        FROM question_details WHERE {conditions} ORDER BY id DESC{limit_sql}
+    """, [pattern] * len(SEARCH_COLUMNS))
+    return cursor.fetchall()
+
+
+# Rows per page in the question list
+PAGE_SIZE = 200
+
+# SQL sort key for each question list column
+SORT_EXPRESSIONS = {
+    'ID': "id",
+    'Question': "question COLLATE NOCASE",
+    'Answer': "answer",
+    'Category': "category COLLATE NOCASE",
+    'Image': "(COALESCE(image_path, '') != '')",
+    'Date': "COALESCE(created_date, '')",
+}
+
+
+def count_questions(conn):
+    """Get the number of questions in the bank"""
+    return conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+
+def fetch_question_row(conn, question_id, sort='ID'):
+    """Get one question in the fetch_question_page row layout, or None if it is gone"""
+    expression = SORT_EXPRESSIONS[sort]
+    return conn.execute(f"""SELECT id, question, answer, category, created_date, image_path, NULL, {expression}
+                            FROM question_details WHERE id = ?""", (question_id,)).fetchone()
+
+
+def fetch_question_page(conn, sort='ID', descending=True, boundary=None, backwards=False,
+                        include_boundary=False, page_size=PAGE_SIZE):
+    """Get one page of the question list using keyset pagination
+
+    Rows are (id, question, answer, category, created_date, image_path, None,
+    sort_key), in the same layout as search_questions plus the sort key.
+    boundary is the (sort_key, id) of the row the page starts after - the last
+    row of the current page, or with backwards=True the first row, to get the
+    previous page. include_boundary starts the page at that row instead (to
+    reload a page). Every page costs the same however deep it is, because
+    it seeks on (sort key, id) instead of skipping rows with OFFSET.
+    """
+    expression = SORT_EXPRESSIONS[sort]
+    # Walking backwards flips the order; the rows are put back the right way round below
+    newest_first = descending != backwards
+    direction = "DESC" if newest_first else "ASC"
+
+    where_sql = ""
+    params = []
+    if boundary is not None:
+        operator = "<" if newest_first else ">"
+        if include_boundary:
+            operator += "="
+        # The plain range on the sort key lets SQLite seek into the sort index;
+        # it can't seek on a row value comparison over an expression
+        where_sql = f"WHERE {expression} {operator[0]}= ? AND ({expression}, id) {operator} (?, ?)"
+        params.extend([boundary[0]] + list(boundary))
+
+    cursor = conn.execute(f"""
+        SELECT id, question, answer, category, created_date, image_path, NULL, {expression}
+        FROM question_details {where_sql}
+        ORDER BY {expression} {direction}, id {direction}
+        LIMIT ?
+    """, params + [page_size])
+    rows = cursor.fetchall()
+    if backwards:
+        rows.reverse()
+    return rows
+
+
+class SearchWorker:
+    """Runs question searches on a background thread with its own connection
+
+    limit caps the number of search matches returned. Only the newest
+    request matters: submitting a search interrupts the one
+    still running and any requests queued behind it are skipped. Results are
+    put on .results as (generation, rows), with rows None if the search
+    failed; the caller ignores generations it has moved past. The newest
+    request always gets an answer, even if it was interrupted itself.
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.results = queue.Queue()
+        self._requests = queue.Queue()
+        self._conn = None
+        self._db_path = None
+        self._busy = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, db_path, search_term, generation):
+        """Queue a search and interrupt the one in progress"""
+        self._requests.put((generation, db_path, search_term))
+        conn = self._conn
+        if conn is not None and self._busy.is_set():
+            conn.interrupt()
+
+    def stop(self):
+        """Stop the worker thread once its current query finishes"""
+        self._requests.put(None)
+
+    def _run(self):
+        while True:
+            request = self._requests.get()
+            # Skip straight to the newest request
+            while request is not None:
+                try:
+                    request = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+            if request is None:
+                break
+
+            generation, db_path, search_term = request
+            rows = None
+            while True:
+                try:
+                    if db_path != self._db_path:
+                        if self._conn is not None:
+                            self._conn.close()
+                        self._conn = connect(db_path)
+                        self._db_path = db_path
+                    self._busy.set()
+                    try:
+                        rows = search_questions(self._conn, search_term, self.limit)
+                    finally:
+                        self._busy.clear()
+                except sqlite3.OperationalError as e:
+                    if 'interrupt' in str(e):
+                        # A submit that raced with picking up this request can
+                        # interrupt it; run it again unless a newer one is waiting
+                        if self._requests.empty():
+                            continue
+                        break
+                    print(f"Search failed: {e}")
+                except sqlite3.Error as e:
+                    print(f"Search failed: {e}")
+                self.results.put((generation, rows))
+                break
+
+        if self._conn is not None:
+            self._conn.close()
+
+
+# Schema changes in the order they were made. A database's PRAGMA user_version
+# is the number of these it has had applied. Never reorder or remove entries;
+# add new ones at the end. Databases from before versioning report version 0
+# whatever their shape, so every step must cope with finding its change
+# already made.
+MIGRATIONS = [
+    create_tables,
+    migrate_to_category_table,
+    add_content_hashes,
+    init_search_index,
+    add_sort_indexes,
+    add_translation_keys,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn):
+    """Get the number of MIGRATIONS this database has had applied"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def init_schema(conn):
+    """Bring a database's schema up to date
+
+    Only the migrations a database is missing are run, each in its own
+    transaction together with the version bump, so a failure leaves the
+    database at the last version that completed. A current database costs
+    one PRAGMA read. Databases written by a newer version are left alone.
+    """
+    version = get_schema_version(conn)
+    if version >= SCHEMA_VERSION:
+        return
+
+    conn.commit()
+    for number, migration in enumerate(MIGRATIONS[version:], version + 1):
+        # DDL doesn't start a transaction implicitly, so begin one explicitly
+        conn.execute("BEGIN")
+        try:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def open_database(db_path):
+    """Open a question database and make sure its schema is current"""
+    conn = connect(db_path)
+    init_schema(conn)
+    return conn
+
+
+class ConnectionPool:
+    """Keeps one open connection per question database for the life of the program
+
+    A database is opened (and migrated) the first time it is used; switching
+    back to it later reuses the same connection. Connections belong to the
+    thread that opened them.
+    """
+
+    def __init__(self):
+        self._connections = {}
+
+    def get(self, db_path):
+        """Get the connection for a database, opening it if needed"""
+        key = os.path.abspath(db_path)
+        conn = self._connections.get(key)
+        if conn is None:
+            conn = open_database(db_path)
+            self._connections[key] = conn
+        return conn
+
+    def close_all(self):
+        """Close every pooled connection"""
+        for conn in self._connections.values():
+            conn.close()
+        self._connections.clear()
+
+
+def ensure_images_dir(images_dir=None):
+    """Create the images folder if needed
+
+    Returns (images_dir, created) so the caller decides whether to tell the user.
+    """
+    images_dir = images_dir or get_images_dir()
+    if os.path.exists(images_dir):
+        return images_dir, False
+    os.makedirs(images_dir)
+    return images_dir, True
@@ -0,0 +1,132 @@
+"""
+Question image ingestion for Journey-Level Exam Generator
+Stores the original picture and a downscaled, print-ready derivative used by the PDFs
+"""
+
+import os
+import shutil
+
+from PIL import Image, ImageOps
+
+from app_paths import get_application_path
+
+# Largest box an image is drawn into on the test (points, see exam_pdf)
+PRINT_BOX = (230, 100)
+# Resolution kept for printing; anything above this is wasted in the PDF
+PRINT_DPI = 300
+ORIGINALS_SUBDIR = 'originals'
+
+
+def _unique_path(directory, filename):
+    """Get a path in directory that does not overwrite an existing file"""
+    name, ext = os.path.splitext(filename)
+    candidate = os.path.join(directory, filename)
+    counter = 1
+    while os.path.exists(candidate):
+        candidate = os.path.join(directory, f"{name}_{counter}{ext}")
+        counter += 1
+    return candidate
+
+
+def _relative_path(full_path):
+    """Store paths relative to the program directory with forward slashes"""
+    return os.path.relpath(full_path, get_application_path()).replace('\\', '/')
+
+
+def create_print_derivative(source_path, dest_dir, stem=None):
+    """Write a downscaled copy of an image sized for the PDF print box
+
+    Photos (JPEG sources) are saved as optimised JPEG, everything else as an
+    optimised PNG so diagrams and panel schedules keep crisp lines. Returns the
+    full path of the derivative.
+    """
+    max_pixels = (round(PRINT_BOX[0] * PRINT_DPI / 72), round(PRINT_BOX[1] * PRINT_DPI / 72))
+    stem = stem or os.path.splitext(os.path.basename(source_path))[0]
+
+    with Image.open(source_path) as img:
+        is_photo = img.format == 'JPEG'
+        # Phone photos are often stored sideways with an EXIF rotation flag
+        img = ImageOps.exif_transpose(img)
+
+        # Fit inside the print box at PRINT_DPI, keeping the aspect ratio (never enlarges).
+        # The layout scales by the same factor either way, so the printed size is unchanged.
+        scale = min(max_pixels[0] / img.width, max_pixels[1] / img.height, 1.0)
+        if scale < 1.0:
+            size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+            img = img.resize(size, Image.LANCZOS)
+
+        if is_photo:
+            dest_path = _unique_path(dest_dir, f"{stem}.jpg")
+            img.convert('RGB').save(dest_path, format='JPEG', quality=85, optimize=True, progressive=True)
+        else:
+            dest_path = _unique_path(dest_dir, f"{stem}.png")
+            if img.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+                img = img.convert('RGBA')
+            img.save(dest_path, format='PNG', optimize=True)
+
+    return dest_path
+
+
+def ingest_image(source_path, images_dir):
+    """Import a picked image into the images folder
+
+    The untouched original is copied to images/originals/ and a print-ready
+    derivative is written to images/. Returns (image_path, original_path) as
+    relative paths for the database.
+    """
+    originals_dir = os.path.join(images_dir, ORIGINALS_SUBDIR)
+    os.makedirs(originals_dir, exist_ok=True)
+
+    original_path = _unique_path(originals_dir, os.path.basename(source_path))
+    shutil.copy2(source_path, original_path)
+
+    stem = os.path.splitext(os.path.basename(original_path))[0]
+    derivative_path = create_print_derivative(original_path, images_dir, stem)
+
+    return _relative_path(derivative_path), _relative_path(original_path)
+
+
+def optimize_existing_images(conn, images_dir, resolve_path):
+    """Create print derivatives for questions whose images were copied in full size
+
+    resolve_path converts a stored image path into a full path. The current
+    image becomes the recorded original and the question is pointed at the
+    derivative. Returns (optimized, skipped). If the database can't be
+    written, nothing is changed, the derivatives made so far are deleted
+    and the error is raised.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""SELECT id, image_path FROM questions
+                      WHERE image_path IS NOT NULL AND image_path != ''
+                        AND (image_original_path IS NULL OR image_original_path = '')""")
+    rows = cursor.fetchall()
+
+    optimized = 0
+    skipped = 0
+    derivatives = {}  # Several questions can share one picture
+    try:
+        for question_id, image_path in rows:
+            full_path = resolve_path(image_path)
+            if not full_path or not os.path.exists(full_path):
+                skipped += 1
+                continue
+            try:
+                derivative = derivatives.get(full_path)
+                if derivative is None:
+                    derivative = create_print_derivative(full_path, images_dir)
+                    derivatives[full_path] = derivative
+            except Exception as e:
+                print(f"Could not optimize image for question {question_id}: {e}")
+                skipped += 1
+                continue
+            cursor.execute("UPDATE questions SET image_path = ?, image_original_path = ? WHERE id = ?",
+                           (_relative_path(derivative), image_path, question_id))
+            optimized += 1
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        for derivative in derivatives.values():
+            if os.path.exists(derivative):
+                os.remove(derivative)
+        raise
+    return optimized, skipped
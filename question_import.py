@@ -0,0 +1,252 @@
+"""
+Question import for Journey-Level Exam Generator
+Validates spreadsheet rows column-wise with pandas and bulk inserts the valid ones
+"""
+
+import os
+
+import pandas as pd
+
+from question_db import question_content_hash, find_existing_hashes, find_existing_translation_keys, get_category_ids
+
+# Rows validated and inserted together; bounds memory for very large files
+BATCH_SIZE = 5000
+
+REQUIRED_COLUMNS = ['Question', 'Answer', 'Category', 'ChoiceA', 'ChoiceB', 'ChoiceC', 'ChoiceD']
+# Optional columns; TranslationKey links a question to its translation in the other language's bank
+TEXT_COLUMNS = REQUIRED_COLUMNS + ['ImagePath', 'TranslationKey']
+
+# Order of the values in each prepared row, matching INSERT_SQL once the
+# category name is replaced by its ID (see with_category_ids).
+# OR IGNORE lets the unique content_hash index drop anything the checks below missed.
+INSERT_SQL = """INSERT OR IGNORE INTO questions (question, answer, category_id, choice_a, choice_b, choice_c, choice_d,
+                                                image_path, content_hash, translation_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+def missing_columns(columns):
+    """Get the required columns a spreadsheet header does not have"""
+    return [col for col in REQUIRED_COLUMNS if col not in columns]
+
+
+def clean_text_columns(df):
+    """Strip every text column, treating blank cells (and the text 'nan') as empty strings"""
+    cleaned = pd.DataFrame(index=df.index)
+    for column in TEXT_COLUMNS:
+        if column in df.columns:
+            values = df[column].astype(object).where(df[column].notna(), '').astype(str).str.strip()
+            cleaned[column] = values.mask(values == 'nan', '')
+        else:
+            cleaned[column] = ''
+    cleaned['Answer'] = cleaned['Answer'].str.upper()
+    return cleaned
+
+
+def prepare_question_rows(df, row_numbers=None, find_existing=None, find_existing_keys=None):
+    """Validate a block of spreadsheet rows in one pass over each column
+
+    row_numbers gives the spreadsheet row of each row in df (by default 2, 3, ...
+    for a sheet whose header is row 1). find_existing(hashes) returns the
+    content hashes already stored; rows matching one, or an earlier row in the
+    block, are skipped as duplicates. find_existing_keys(keys) likewise returns
+    the translation keys already used; a row reusing one is skipped. Returns
+    (rows, log_lines, skipped, duplicates) where rows are tuples ready for
+    INSERT_SQL, log_lines describe every row in spreadsheet order and skipped
+    does not include duplicates.
+    """
+    if df.empty:
+        return [], [], 0, 0
+
+    cleaned = clean_text_columns(df)
+    if row_numbers is None:
+        row_numbers = range(2, 2 + len(df))
+    row_numbers = pd.Series(list(row_numbers), index=df.index).astype(str)
+
+    # At least Question, Answer, Category, Choice A and Choice B must be provided
+    missing = (cleaned[['Question', 'Answer', 'Category', 'ChoiceA', 'ChoiceB']] == '').any(axis=1)
+
+    # The answer letter must point at a choice that was provided
+    answer_has_choice = pd.Series(False, index=df.index)
+    for letter in 'ABCD':
+        answer_has_choice |= (cleaned['Answer'] == letter) & (cleaned[f'Choice{letter}'] != '')
+    bad_answer = ~missing & ~answer_has_choice
+    valid = ~missing & answer_has_choice
+
+    # Same question, choices and answer as an earlier row or a stored question
+    hashes = pd.Series(None, index=df.index, dtype=object)
+    hashes[valid] = [question_content_hash(*values) for values in
+                     zip(cleaned['Question'][valid], cleaned['Answer'][valid], cleaned['ChoiceA'][valid],
+                         cleaned['ChoiceB'][valid], cleaned['ChoiceC'][valid], cleaned['ChoiceD'][valid])]
+    duplicate = valid & hashes.duplicated()
+    if find_existing is not None and valid.any():
+        existing = find_existing(hashes[valid].unique())
+        duplicate |= valid & hashes.isin(existing)
+    valid &= ~duplicate
+
+    # A translation key can only link one question per bank
+    keyed = valid & (cleaned['TranslationKey'] != '')
+    key_taken = keyed & cleaned['TranslationKey'].where(keyed).duplicated()
+    if find_existing_keys is not None and keyed.any():
+        existing_keys = find_existing_keys(cleaned['TranslationKey'][keyed].unique())
+        key_taken |= keyed & cleaned['TranslationKey'].isin(existing_keys)
+    valid &= ~key_taken
+
+    messages = pd.Series('', index=df.index)
+    messages[missing] = ("Row " + row_numbers[missing] + ": Skipped (missing required data - need at least "
+                         "Question, Answer, Category, Choice A, and Choice B)")
+    messages[bad_answer] = ("Row " + row_numbers[bad_answer] + ": Skipped (answer '" + cleaned['Answer'][bad_answer]
+                            + "' doesn't match any provided choice)")
+    messages[duplicate] = "Row " + row_numbers[duplicate] + ": Skipped (duplicate question)"
+    messages[key_taken] = ("Row " + row_numbers[key_taken] + ": Skipped (translation key '"
+                           + cleaned['TranslationKey'][key_taken] + "' is already used)")
+    image_notes = cleaned['ImagePath'][valid].map(lambda path: " [with image]" if path else "")
+    messages[valid] = ("Row " + row_numbers[valid] + ": Imported - " + cleaned['Category'][valid]
+                       + " (Answer: " + cleaned['Answer'][valid] + ")" + image_notes)
+
+    accepted = cleaned[valid]
+    image_paths = [path or None for path in accepted['ImagePath']]
+    translation_keys = [key or None for key in accepted['TranslationKey']]
+    rows = list(zip(accepted['Question'], accepted['Answer'], accepted['Category'],
+                    accepted['ChoiceA'], accepted['ChoiceB'], accepted['ChoiceC'], accepted['ChoiceD'],
+                    image_paths, hashes[valid], translation_keys))
+    return rows, messages.tolist(), int((missing | bad_answer | key_taken).sum()), int(duplicate.sum())
+
+
+def with_category_ids(conn, rows):
+    """Replace the category name in prepared rows with its ID, adding new categories"""
+    category_ids = get_category_ids(conn, (row[2] for row in rows))
+    return [row[:2] + (category_ids[row[2]],) + row[3:] for row in rows]
+
+
+class ImportFormatError(ValueError):
+    """Raised when a file is missing the columns an import needs"""
+
+
+class ImportCancelled(Exception):
+    """Raised when an import is cancelled; nothing from the file is kept"""
+
+
+def _check_columns(columns):
+    """Raise ImportFormatError if a header lacks required columns"""
+    missing_cols = missing_columns(columns)
+    if missing_cols:
+        raise ImportFormatError(f"Missing required columns: {', '.join(missing_cols)}\n"
+                                f"Found columns: {', '.join(map(str, columns))}")
+
+
+def _iter_xlsx_batches(filepath, batch_size):
+    """Stream an .xlsx sheet with openpyxl in read-only mode
+
+    Yields (df, row_numbers, total_rows); total_rows is None when the sheet
+    does not record its size. Completely blank rows are left out.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        total_rows = sheet.max_row - 1 if sheet.max_row else None
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        columns = ['' if cell is None else str(cell) for cell in (header or ())]
+        _check_columns(columns)
+
+        batch = []
+        row_numbers = []
+        for row_number, values in enumerate(rows, 2):
+            if all(value is None or value == '' for value in values):
+                continue
+            # read-only sheets can report short rows, so pad them out to the header
+            values = tuple(values[:len(columns)])
+            batch.append(values + (None,) * (len(columns) - len(values)))
+            row_numbers.append(row_number)
+            if len(batch) >= batch_size:
+                yield pd.DataFrame(batch, columns=columns), row_numbers, total_rows
+                batch = []
+                row_numbers = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns), row_numbers, total_rows
+    finally:
+        workbook.close()
+
+
+def _iter_csv_batches(filepath, batch_size):
+    """Read a CSV file in fixed-size chunks (the total is not known up front)"""
+    first = True
+    for chunk in pd.read_csv(filepath, chunksize=batch_size, dtype=str, encoding='utf-8-sig'):
+        if first:
+            _check_columns(list(chunk.columns))
+            first = False
+        yield chunk, chunk.index + 2, None
+
+
+def _iter_excel_batches(filepath, batch_size):
+    """Older .xls workbooks can't be streamed, so read them whole and validate in batches"""
+    df = pd.read_excel(filepath)
+    _check_columns(list(df.columns))
+    for start in range(0, len(df), batch_size):
+        chunk = df.iloc[start:start + batch_size]
+        yield chunk, chunk.index + 2, len(df)
+
+
+def iter_question_batches(filepath, batch_size=BATCH_SIZE):
+    """Yield (df, row_numbers, total_rows) blocks of at most batch_size rows from a question file
+
+    .xlsx/.xlsm files are streamed row by row and .csv files are read in
+    chunks, so memory stays bounded however large the file is. Raises
+    ImportFormatError before any rows are returned if required columns are
+    missing.
+    """
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in ('.xlsx', '.xlsm'):
+        return _iter_xlsx_batches(filepath, batch_size)
+    if ext in ('.csv', '.txt'):
+        return _iter_csv_batches(filepath, batch_size)
+    return _iter_excel_batches(filepath, batch_size)
+
+
+def import_question_file(conn, filepath, batch_size=BATCH_SIZE, progress_callback=None, log_callback=None,
+                         cancel_event=None):
+    """Import a question file batch by batch inside one transaction
+
+    Each batch is validated with prepare_question_rows and written with one
+    executemany. log_callback(lines) receives each batch's log lines and
+    progress_callback(rows_done, total_rows, imported) is called after each
+    batch is written (total_rows may be None). Setting cancel_event stops
+    before the next batch with ImportCancelled. Any error or cancel rolls the
+    whole import back. Rows already in the bank (same content hash) are
+    skipped. Returns (imported, skipped, duplicates).
+    """
+    imported = 0
+    skipped = 0
+    duplicates = 0
+    rows_done = 0
+
+    def find_existing(hashes):
+        return find_existing_hashes(conn, hashes)
+
+    def find_existing_keys(keys):
+        return find_existing_translation_keys(conn, keys)
+
+    with conn:
+        for df, row_numbers, total_rows in iter_question_batches(filepath, batch_size):
+            if cancel_event is not None and cancel_event.is_set():
+                raise ImportCancelled()
+            # Earlier batches are already inserted, so they are found as existing rows
+            rows, log_lines, batch_skipped, batch_duplicates = prepare_question_rows(df, row_numbers, find_existing,
+                                                                                   find_existing_keys)
+            rows = with_category_ids(conn, rows)
+            # rowcount leaves out rows written by triggers (the search index), unlike total_changes
+            added = conn.executemany(INSERT_SQL, rows).rowcount
+            imported += added
+            skipped += batch_skipped
+            duplicates += batch_duplicates + len(rows) - added
+            rows_done += len(df)
+            if log_callback:
+                log_callback(log_lines)
+            if progress_callback:
+                progress_callback(rows_done, total_rows, imported)
+        if cancel_event is not None and cancel_event.is_set():
+            raise ImportCancelled()
+
+    return imported, skipped, duplicates
@@ -0,0 +1,116 @@
+"""
+Cross-database reports for Journey-Level Exam Generator
+Attaches the four mode/language question banks to one connection so they can be compared in SQL
+"""
+
+import os
+import pathlib
+import sqlite3
+
+import question_db
+
+# Schema name each bank is attached under, in report column order
+SCHEMA_NAMES = {
+    ("JW", "English"): 'jw_en',
+    ("JW", "Spanish"): 'jw_es',
+    ("CW/CE", "English"): 'cw_en',
+    ("CW/CE", "Spanish"): 'cw_es',
+}
+
+
+def open_all_databases(directory=None):
+    """Open one connection with every question bank that exists attached read-only
+
+    Banks are looked for in directory (default: the current folder, where
+    the GUI keeps them) and brought up to the current schema before being
+    attached. Returns (conn, attached) where attached maps (mode, language)
+    to the schema name of each bank found.
+    """
+    directory = directory or os.getcwd()
+    conn = sqlite3.connect('file::memory:', uri=True)
+    attached = {}
+    for key, schema in SCHEMA_NAMES.items():
+        path = os.path.join(directory, question_db.DATABASE_FILES[key])
+        if not os.path.exists(path):
+            continue
+        question_db.open_database(path).close()
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (pathlib.Path(path).resolve().as_uri() + '?mode=ro',))
+        attached[key] = schema
+    return conn, attached
+
+
+def category_counts(conn, attached):
+    """Get {(mode, language): {category: number of questions}} for every attached bank, in one query"""
+    selects = []
+    params = []
+    for (mode, language), schema in attached.items():
+        selects.append(f"""SELECT ?, ?, c.name, COUNT(*) FROM {schema}.questions q
+                           JOIN {schema}.categories c ON c.id = q.category_id GROUP BY q.category_id""")
+        params.extend([mode, language])
+    counts = {key: {} for key in attached}
+    if selects:
+        for mode, language, category, count in conn.execute(" UNION ALL ".join(selects), params):
+            counts[(mode, language)][category] = count
+    return counts
+
+
+def missing_translations(conn, attached, mode, source="English", target="Spanish"):
+    """Get the questions in one language's bank that have no translation in the other
+
+    A translation is the question in the target bank with the same
+    translation_key, so questions without a key are always listed. Every
+    question is missing if the target bank doesn't exist yet. Returns (id,
+    question, category, translation_key) rows from the source bank, by ID.
+    """
+    source_schema = attached.get((mode, source))
+    if source_schema is None:
+        return []
+    target_schema = attached.get((mode, target))
+
+    query = f"""SELECT q.id, q.question, c.name, q.translation_key
+                FROM {source_schema}.questions q JOIN {source_schema}.categories c ON c.id = q.category_id"""
+    if target_schema is not None:
+        query += f"""
+                WHERE q.translation_key IS NULL
+                   OR NOT EXISTS (SELECT 1 FROM {target_schema}.questions t
+                                  WHERE t.translation_key = q.translation_key)"""
+    return conn.execute(query + " ORDER BY q.id").fetchall()
+
+
+def translation_summary(conn, attached):
+    """Get (mode, english questions, spanish questions, translated) for each mode with an English bank
+
+    translated counts English questions whose translation_key is also in the Spanish bank.
+    """
+    summary = []
+    for mode in ("JW", "CW/CE"):
+        english = attached.get((mode, "English"))
+        if english is None:
+            continue
+        spanish = attached.get((mode, "Spanish"))
+        english_total = conn.execute(f"SELECT COUNT(*) FROM {english}.questions").fetchone()[0]
+        if spanish is None:
+            summary.append((mode, english_total, 0, 0))
+            continue
+        spanish_total, translated = conn.execute(f"""
+            SELECT (SELECT COUNT(*) FROM {spanish}.questions),
+                   (SELECT COUNT(*) FROM {english}.questions e
+                    JOIN {spanish}.questions s ON s.translation_key = e.translation_key)""").fetchone()
+        summary.append((mode, english_total, spanish_total, translated))
+    return summary
+
+
+def format_category_report(counts):
+    """Format category_counts() as a table with one column per bank"""
+    banks = list(counts)
+    if not banks:
+        return "No question databases found"
+
+    categories = sorted({category for bank_counts in counts.values() for category in bank_counts}, key=str.casefold)
+    headers = [f"{mode} {'EN' if language == 'English' else 'ES'}" for mode, language in banks]
+    width = max([len("Category")] + [len(category) for category in categories])
+    lines = [f"{'Category':<{width}}" + "".join(f"{header:>10}" for header in headers)]
+    for category in categories:
+        lines.append(f"{category:<{width}}" + "".join(f"{counts[bank].get(category, 0):>10}" for bank in banks))
+    lines.append(f"{'Total':<{width}}" + "".join(f"{sum(counts[bank].values()):>10}" for bank in banks))
+    return "\n".join(lines)
@@ -1,22 +1,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import sqlite3
-import pandas as pd
-import random
 from datetime import datetime
 import os
-import shutil
-import uuid
+import sqlite3
 import sys
-import json
 import time
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from PIL import Image, ImageTk
-import shutil
-from reportlab.lib.units import inch
-from threading import Thread
+from threading import Thread, Event
+import queue
+import multiprocessing
+import exam_engine
+import exam_pdf
+import question_db
+import question_images
+from app_paths import get_application_path, get_resource_path, resolve_image_path
+from app_settings import load_app_settings, save_app_settings
 
 # Import auto-updater functions
 try:
@@ -26,31 +23,6 @@ except ImportError:
     print("Auto-updater not available")
     AUTO_UPDATE_AVAILABLE = False
 
-def get_application_path():
-    """Get the directory where the application is located (works for both .py and .exe)"""
-    if getattr(sys, 'frozen', False):
-        # Running as compiled executable (both onefile and onedir)
-        return os.path.dirname(sys.executable)
-    else:
-        # Running as Python script
-        return os.path.dirname(os.path.abspath(__file__))
-
-def get_resource_path(relative_path):
-    """Get absolute path to resource, works for dev and for PyInstaller onefile/onedir"""
-    if getattr(sys, 'frozen', False):
-        # PyInstaller bundle
-        if hasattr(sys, '_MEIPASS'):
-            # onefile mode - temp extraction folder
-            base_path = sys._MEIPASS
-        else:
-            # onedir mode - same directory as executable
-            base_path = os.path.dirname(sys.executable)
-    else:
-        # Not running as PyInstaller bundle, use regular path
-        base_path = os.path.dirname(os.path.abspath(__file__))
-    
-    return os.path.join(base_path, relative_path)
-
 class TestGeneratorApp:
     def __init__(self, root):
         self.root = root
@@ -62,6 +34,9 @@ class TestGeneratorApp:
         self.current_language = "English"  # Default to English
         self.jw_database = 'test_questions.db'  # Current default database
         self.cw_database = None  # Will be set dynamically based on language
+        # Every database used this session stays open, so switching back is instant
+        self.db_pool = question_db.ConnectionPool()
+        self.database_views = {}  # Database path -> question list and category state when last shown
         
         # Set the lightning bolt icon
         try:
@@ -93,96 +68,98 @@ class TestGeneratorApp:
     
     def load_settings(self):
         """Load application settings including database paths, mode, and language"""
-        settings_file = 'app_settings.json'
-        try:
-            if os.path.exists(settings_file):
-                with open(settings_file, 'r') as f:
-                    settings = json.load(f)
-                    self.current_mode = settings.get('current_mode', 'JW')
-                    self.current_language = settings.get('current_language', 'English')
-            else:
-                # Default settings
-                self.current_mode = "JW"
-                self.current_language = "English"
-        except Exception as e:
-            print(f"Error loading settings: {e}")
-            self.current_mode = "JW"
-            self.current_language = "English"
+        settings = load_app_settings()
+        self.current_mode = settings.get('current_mode', 'JW')
+        self.current_language = settings.get('current_language', 'English')
     
     def save_settings(self):
-        """Save application settings"""
-        settings = {
+        """Save application settings (other keys in the file, such as database tuning, are kept)"""
+        save_app_settings({
             'current_mode': self.current_mode,
             'current_language': self.current_language
-        }
-        try:
-            with open('app_settings.json', 'w') as f:
-                json.dump(settings, f)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+        })
     
     def get_current_database_path(self):
         """Get the database path for current mode and language combination"""
-        # Create database filename based on mode and language combination
-        if self.current_mode == "JW":
-            if self.current_language == "English":
-                return 'test_questions.db'  # Original JW English database
-            else:  # Spanish
-                return 'test_questions_spanish.db'
-        else:  # CW/CE mode
-            if self.current_language == "English":
-                return 'cw_questions.db'
-            else:  # Spanish
-                return 'cw_questions_spanish.db'
-    
-    def get_exam_title(self):
-        """Get the exam title based on current mode and language"""
-        if self.current_mode == "CW/CE":
-            if self.current_language == "Spanish":
-                return "Examen CW/CE"
-            else:
-                return "CW/CE Exam"
-        else:  # JW mode
-            if self.current_language == "Spanish":
-                return "Examen de Competencia de Nivel de Viaje"
-            else:
-                return "Journey-Level Proficiency Exam"
+        return question_db.get_database_path(self.current_mode, self.current_language)
     
     def switch_database_selection(self, new_mode, new_language):
-        """Switch database based on mode and language combination"""
+        """Switch database based on mode and language combination
+        
+        The databases stay open in self.db_pool, and the list page and category
+        counts each one last showed are reused if it hasn't changed since.
+        """
         if new_mode == self.current_mode and new_language == self.current_language:
             return True  # No change needed
         
-        # Close current database connection
-        if hasattr(self, 'conn'):
-            self.conn.close()
+        old_mode, old_language = self.current_mode, self.current_language
+        self.save_database_view()
         
         # Update mode and language
         self.current_mode = new_mode
         self.current_language = new_language
         
-        # Reinitialize database connection (will create database if needed)
+        # Get the pooled connection (opened and created the first time it is used)
         try:
-            self.init_database()
-            
-            # Refresh all UI components
-            self.load_questions()
-            self.load_category_settings()
-            
-            # Update window title
-            self.update_window_title()
-            
-            # Save settings
-            self.save_settings()
-            
-            db_path = self.get_current_database_path()
-            print(f"Switched to {new_mode} {new_language} mode (database: {db_path})")
-            return True
-            
+            self.conn = self.db_pool.get(self.get_current_database_path())
         except Exception as e:
             print(f"Error switching to {new_mode} {new_language} mode: {str(e)}")
-            # Continue anyway - database will be created
-            return True
+            messagebox.showerror("Error", f"Could not open the {new_mode} {new_language} database: {e}")
+            self.current_mode, self.current_language = old_mode, old_language
+            return False
+        
+        # Refresh all UI components
+        self.search_entry.delete(0, tk.END)
+        self.restore_database_view()
+        
+        # Update window title
+        self.update_window_title()
+        
+        # Save settings
+        self.save_settings()
+        
+        db_path = self.get_current_database_path()
+        print(f"Switched to {new_mode} {new_language} mode (database: {db_path})")
+        return True
+    
+    def save_database_view(self):
+        """Remember the current database's list page and category counts for switching back"""
+        self.database_views[self.get_current_database_path()] = {
+            'data_version': self.conn.execute("PRAGMA data_version").fetchone()[0],
+            'sort': (self.question_sort, self.question_sort_descending),
+            'page': self.question_page if not self.searching() else None,
+            'page_offset': self.question_page_offset,
+            'total': self.question_total,
+            'category_counts': dict(self.category_counts),
+        }
+    
+    def restore_database_view(self):
+        """Show the current database's list and categories, reusing its saved view if still valid
+        
+        PRAGMA data_version changes when another connection (such as an
+        import) commits to the file; this app's own edits only ever go to the
+        database on screen.
+        """
+        view = self.database_views.pop(self.get_current_database_path(), None)
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if view is None or view['data_version'] != data_version:
+            self.question_page = []
+            self.load_questions(first_page=True)
+            self.load_category_settings()
+            return
+        
+        if view['page'] is not None and view['sort'] == (self.question_sort, self.question_sort_descending):
+            self.search_generation += 1  # Any search still running is out of date now
+            self.question_page = view['page']
+            self.question_page_offset = view['page_offset']
+            self.question_total = view['total']
+            self.sync_question_tree(self.question_page)
+            self.update_page_controls()
+        else:
+            self.question_page = []
+            self.question_total = view['total']
+            self.load_questions(first_page=True, recount=False)
+        self.load_category_settings(view['category_counts'])
     
     def update_window_title(self):
         """Update window title based on current mode and language"""
@@ -190,12 +167,13 @@ class TestGeneratorApp:
         lang_suffix = "ES" if self.current_language == "Spanish" else "EN"
         self.root.title(f"{base_title} - {self.current_mode} ({lang_suffix})")
     
-    def get_exam_title(self):
-        """Get the appropriate exam title based on current mode"""
-        if self.current_mode == "CW/CE":
-            return "CW/CE Exam"
-        else:
-            return "Journey-Level Proficiency Exam"
+    def get_exam_title(self, language=None):
+        """Get the exam title for the current mode in the current (or given) language"""
+        return exam_engine.get_exam_title(self.current_mode, language or self.current_language)
+    
+    def get_other_language(self):
+        """Get the language of the other bank for the current mode"""
+        return "Spanish" if self.current_language == "English" else "English"
 
     def fix_image_paths(self):
         """Fix image paths in database to include images/ prefix"""
@@ -225,30 +203,7 @@ class TestGeneratorApp:
         1. Bundled resources in PyInstaller (sys._MEIPASS)
         2. User images in the working directory (where EXE is located)
         """
-        if not relative_path:
-            return None
-        if os.path.isabs(relative_path):
-            return relative_path
-        
-        # For PyInstaller, check the bundled images first (in _MEIPASS)
-        if getattr(sys, 'frozen', False):
-            bundled_path = get_resource_path(relative_path)
-            if os.path.exists(bundled_path):
-                return bundled_path
-        
-        # Then try the user's working directory (where databases are)
-        full_path = os.path.join(get_application_path(), relative_path)
-        if os.path.exists(full_path):
-            return full_path
-        
-        # If not found, try looking in the images folder
-        if not relative_path.startswith('images/') and not relative_path.startswith('images\\'):
-            images_path = os.path.join(self.images_dir, relative_path)
-            if os.path.exists(images_path):
-                return images_path
-        
-        # Return the original attempt if nothing else works
-        return full_path
+        return resolve_image_path(relative_path, self.images_dir)
     
     def create_menu(self):
         """Create application menu bar"""
@@ -266,6 +221,7 @@ class TestGeneratorApp:
         menubar.add_cascade(label="Tools", menu=tools_menu)
         tools_menu.add_command(label="Backup Database", command=self.backup_database)
         tools_menu.add_command(label="Import from Excel", command=self.import_from_excel)
+        tools_menu.add_command(label="Optimize Question Images", command=self.optimize_question_images)
         
         # Help menu
         help_menu = tk.Menu(menubar, tearoff=0)
@@ -310,7 +266,8 @@ GitHub: github.com/zerocool5878/Journey-Level-Exam-Generator"""
         """Create a backup of the current database"""
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"test_questions_backup_{timestamp}.db"
+            db_name = os.path.splitext(os.path.basename(self.get_current_database_path()))[0]
+            backup_filename = f"{db_name}_backup_{timestamp}.db"
             
             # Choose backup location
             backup_path = filedialog.asksaveasfilename(
@@ -321,30 +278,46 @@ GitHub: github.com/zerocool5878/Journey-Level-Exam-Generator"""
             )
             
             if backup_path:
-                shutil.copy2('test_questions.db', backup_path)
+                # Copy through SQLite: in WAL mode recent changes may still be in the -wal file
+                backup_conn = sqlite3.connect(backup_path)
+                try:
+                    self.conn.backup(backup_conn)
+                finally:
+                    backup_conn.close()
                 messagebox.showinfo("Backup Complete", 
                                   f"Database backed up successfully to:\n{backup_path}")
         except Exception as e:
             messagebox.showerror("Backup Failed", f"Error creating backup: {str(e)}")
     
+    def optimize_question_images(self):
+        """Create print-ready copies of full-size images already in the database"""
+        if self.import_blocks_writes():
+            return
+        if not messagebox.askyesno("Optimize Question Images",
+                                   "Create downscaled print copies for question images?\n\n" +
+                                   "Original files are kept and recorded. PDFs will be smaller and faster to build."):
+            return
+        try:
+            optimized, skipped = question_images.optimize_existing_images(self.conn, self.images_dir,
+                                                                         self.get_image_full_path)
+            self.invalidate_question_pool()
+            messagebox.showinfo("Optimize Question Images",
+                                f"Optimized {optimized} question images.\nSkipped {skipped} (missing or unreadable).")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to optimize images: {str(e)}")
+    
     def init_database(self):
         """Initialize SQLite database with required tables and create images folder"""
         # Get current database path based on mode
         current_db_path = self.get_current_database_path()
-        self.conn = sqlite3.connect(current_db_path)
-        cursor = self.conn.cursor()
+        self.conn = self.db_pool.get(current_db_path)
         
         # Create images directory if it doesn't exist
         # Use the actual executable directory, not the temporary PyInstaller directory
-        self.images_dir = os.path.join(get_application_path(), 'images')
-        
-        # Check if folder exists and if it has any files (not just empty from build)
-        folder_exists = os.path.exists(self.images_dir)
-        has_files = folder_exists and len(os.listdir(self.images_dir)) > 0
+        self.images_dir, created = question_db.ensure_images_dir()
         
-        if not folder_exists:
+        if created:
             # Truly creating new folder
-            os.makedirs(self.images_dir)
             messagebox.showinfo("Images Folder Created", 
                               f"Created 'images' folder at:\n{self.images_dir}\n\n" + 
                               "All question images will be automatically copied here when you select them.")
@@ -352,40 +325,6 @@ GitHub: github.com/zerocool5878/Journey-Level-Exam-Generator"""
         else:
             # Folder exists (may be empty from build)
             print(f"Using existing images directory: {self.images_dir}")
-        
-        # Questions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS questions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                question TEXT NOT NULL,
-                answer TEXT NOT NULL,
-                category TEXT NOT NULL,
-                choice_a TEXT DEFAULT NULL,
-                choice_b TEXT DEFAULT NULL,
-                choice_c TEXT DEFAULT NULL,
-                choice_d TEXT DEFAULT NULL,
-                image_path TEXT DEFAULT NULL,
-                created_date TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Add new columns if they don't exist (for existing databases)
-        new_columns = ['image_path', 'choice_a', 'choice_b', 'choice_c', 'choice_d']
-        for column in new_columns:
-            try:
-                cursor.execute(f'ALTER TABLE questions ADD COLUMN {column} TEXT DEFAULT NULL')
-            except sqlite3.OperationalError:
-                pass  # Column already exists
-        
-        # Category settings table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS category_settings (
-                category TEXT PRIMARY KEY,
-                percentage INTEGER DEFAULT 0
-            )
-        ''')
-        
-        self.conn.commit()
     
     def create_styled_button(self, parent, text, command, style_type="primary"):
         """Create a styled tk.Button that works reliably in PyInstaller"""
@@ -670,10 +609,19 @@ GitHub: github.com/zerocool5878/Journey-Level-Exam-Generator"""
         self.name_entry = ttk.Entry(name_frame, style='Modern.TEntry', width=40, justify='center')
         self.name_entry.pack(pady=(0, 5))
         
+        # Paired generation: the same questions from the other language's bank
+        self.bilingual_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(name_frame, text="🌐 Also make the other language's version (same questions and Test ID)",
+                        variable=self.bilingual_var).pack(pady=(0, 5))
+        
         # Generate test button using styled tk.Button
         self.create_styled_button(content_frame, "🎯 Generate Test (50 Questions)", 
                   self.generate_test, "primary").pack(pady=10)
         
+        # Batch generation for a whole class roster
+        self.create_styled_button(content_frame, "👥 Generate Class Batch from Roster", 
+                  self.generate_batch_from_roster, "primary").pack(pady=(0, 10))
+        
         # Test preview section
         preview_section = ttk.Frame(content_frame, style='Card.TFrame')
         preview_section.pack(fill=tk.BOTH, expand=True, pady=(0, 10), padx=5)
@@ -704,8 +652,19 @@ GitHub: github.com/zerocool5878/Journey-Level-Exam-Generator"""
                   self.export_to_pdf, "success").pack(side=tk.LEFT, padx=5)
         self.create_styled_button(button_frame, "📋 Export Answer Key", 
                   self.export_answer_key, "success").pack(side=tk.LEFT, padx=5)
+        self.create_styled_button(button_frame, "📦 Export Batch PDFs", 
+                  self.export_batch_pdfs, "success").pack(side=tk.LEFT, padx=5)
         self.create_styled_button(button_frame, "🗑️ Clear Preview", 
                   self.clear_preview, "warning").pack(side=tk.LEFT, padx=5)
+        
+        # Export progress (hidden until an export starts)
+        self.export_progress_frame = ttk.Frame(content_frame)
+        self.export_progress = ttk.Progressbar(self.export_progress_frame, mode='determinate', length=400)
+        self.export_progress.pack(side=tk.LEFT, padx=5)
+        self.export_progress_label = ttk.Label(self.export_progress_frame, text="", font=("Segoe UI", 9))
+        self.export_progress_label.pack(side=tk.LEFT, padx=5)
+        self.create_styled_button(self.export_progress_frame, "✖ Cancel", 
+                  self.cancel_export, "warning").pack(side=tk.LEFT, padx=5)
     
     def create_questions_tab(self):
         """Create the question management tab"""
@@ -738,8 +697,21 @@ GitHub: github.com/zerocool5878/Journey-Level-Exam-Generator"""
         ttk.Label(search_frame, text="🔍 Search:", style='Subheading.TLabel').pack(side=tk.LEFT, padx=(10, 5))
         self.search_entry = ttk.Entry(search_frame, style='Modern.TEntry', width=35)
         self.search_entry.pack(side=tk.LEFT, padx=5)
+        # Results follow the search box as the user types (see on_search_typed)
+        self.search_entry.bind('<KeyRelease>', self.on_search_typed)
+        self.search_entry.bind('<Return>', lambda e: self.search_questions())
         ttk.Button(search_frame, text="🔍 Search", command=self.search_questions, style="Primary.TButton").pack(side=tk.LEFT, padx=5)
-        ttk.Button(search_frame, text="📋 Show All", command=self.load_questions, style="Success.TButton").pack(side=tk.LEFT, padx=5)
+        ttk.Button(search_frame, text="📋 Show All", command=self.show_all_questions, style="Success.TButton").pack(side=tk.LEFT, padx=5)
+        self.search_worker = None
+        self.search_generation = 0
+        self.search_awaited = 0
+        self.search_after_id = None
+        self.search_polling = False
+        self.question_tree_rows = {}  # Treeview item ID (question ID) -> displayed values
+        self.question_sort = 'ID'
+        self.question_sort_descending = True
+        self.question_page = []  # Rows of the page on screen
+        self.question_page_offset = 0  # Position of its first row in the sorted list
         
         # Database table
         database_frame = ttk.Frame(content_frame, style='Card.TFrame')
@@ -762,8 +734,12 @@ GitHub: github.com/zerocool5878/Journey-Level-Exam-Generator"""
             'Date': '📅 Date'
         }
         
+        self.question_column_headers = column_headers
+        
         for col in columns:
-            self.questions_tree.heading(col, text=column_headers[col])
+            # Clicking a heading sorts the list by that column (in SQL, see fetch_question_page)
+            self.questions_tree.heading(col, text=column_headers[col],
+                                        command=lambda c=col: self.sort_questions_by(c))
             if col == 'Question':
                 self.questions_tree.column(col, width=300)  # Reduced to make room for image column
             elif col == 'Answer':
@@ -783,6 +759,18 @@ GitHub: github.com/zerocool5878/Journey-Level-Exam-Generator"""
         self.questions_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
         tree_scroll.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 10), pady=10)
         
+        # Page controls - only one page of questions is loaded at a time
+        page_frame = ttk.Frame(database_frame)
+        page_frame.pack(pady=(0, 5))
+        self.prev_page_button = ttk.Button(page_frame, text="◀ Previous", command=self.previous_question_page,
+                                           style="Primary.TButton")
+        self.prev_page_button.pack(side=tk.LEFT, padx=5)
+        self.page_label = ttk.Label(page_frame, text="", font=("Segoe UI", 9))
+        self.page_label.pack(side=tk.LEFT, padx=10)
+        self.next_page_button = ttk.Button(page_frame, text="Next ▶", command=self.next_question_page,
+                                           style="Primary.TButton")
+        self.next_page_button.pack(side=tk.LEFT, padx=5)
+        
         # Management buttons at bottom
         mgmt_frame = ttk.Frame(content_frame)
         mgmt_frame.pack(pady=10)
@@ -947,6 +935,15 @@ GitHub: github.com/zerocool5878/Journey-Level-Exam-Generator"""
         ttk.Button(import_btn_frame, text="📊 Import Questions", command=self.import_from_excel, 
                   style="Success.TButton").pack()
         
+        # Import progress, updated as each batch of rows is written
+        self.import_progress = ttk.Progressbar(import_btn_frame, mode='determinate', length=400)
+        self.import_progress.pack(pady=(10, 0))
+        self.import_progress_label = ttk.Label(import_btn_frame, text="", font=("Segoe UI", 9))
+        self.import_progress_label.pack()
+        self.import_cancel_button = ttk.Button(import_btn_frame, text="✖ Cancel Import", command=self.cancel_import,
+                                               style="Warning.TButton", state="disabled")
+        self.import_cancel_button.pack(pady=(5, 0))
+        
         # Import log with modern styling  
         log_section = ttk.Frame(content_frame, style='Card.TFrame')
         log_section.pack(fill=tk.BOTH, expand=True, ipady=10)
@@ -965,6 +962,30 @@ GitHub: github.com/zerocool5878/Journey-Level-Exam-Generator"""
         self.import_log.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         log_scroll.pack(side=tk.RIGHT, fill=tk.Y)
     
+    def get_question_pool(self):
+        """Get the cached question pool for the current database"""
+        return exam_engine.get_question_pool(self.conn, self.get_current_database_path())
+    
+    def invalidate_question_pool(self):
+        """Discard the cached question pool after questions or category settings change"""
+        exam_engine.invalidate_question_pool(self.get_current_database_path())
+    
+    def get_translated_question_pool(self):
+        """Get the cached pool of the other language's bank for the current mode
+        
+        Shows an error and returns None if that bank doesn't exist yet.
+        """
+        db_path = question_db.get_database_path(self.current_mode, self.get_other_language())
+        if not os.path.exists(db_path):
+            messagebox.showerror("Error", f"There is no {self.current_mode} {self.get_other_language()} "
+                                          f"question bank yet ({db_path})")
+            return None
+        return exam_engine.get_question_pool(self.db_pool.get(db_path), db_path)
+    
+    def get_language_tags(self):
+        """Get the file name tags for (current language, other language) versions of paired exams"""
+        return ("EN", "ES") if self.current_language == "English" else ("ES", "EN")
+    
     def generate_test(self):
         """Generate a random test based on category settings"""
         name = self.name_entry.get().strip()
@@ -972,91 +993,98 @@ GitHub: github.com/zerocool5878/Journey-Level-Exam-Generator"""
             messagebox.showerror("Error", "Please enter the test taker's name")
             return
         
-        # Get category settings
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT category, percentage FROM category_settings WHERE percentage > 0")
-        category_settings = dict(cursor.fetchall())
+        # Questions and category settings come from the in-memory pool
+        pool = self.get_question_pool()
         
-        if not category_settings:
+        if not pool.category_settings:
             messagebox.showerror("Error", "No category settings configured")
             return
         
-        # Calculate questions per category
-        questions_per_category = {}
-        total_questions = 50
-        
-        for category, percentage in category_settings.items():
-            count = round((percentage / 100) * total_questions)
-            questions_per_category[category] = count
-        
-        # Adjust to exactly 50 questions
-        current_total = sum(questions_per_category.values())
-        if current_total != total_questions:
-            # Adjust the largest category
-            largest_cat = max(questions_per_category.keys(), key=lambda k: questions_per_category[k])
-            questions_per_category[largest_cat] += (total_questions - current_total)
-        
-        # Select random questions for each category
-        selected_questions = []
-        debug_info = []  # For debugging
-        
-        for category, count in questions_per_category.items():
-            if count > 0:
-                # First check how many questions are available in this category
-                cursor.execute("SELECT COUNT(*) FROM questions WHERE category = ?", (category,))
-                available = cursor.fetchone()[0]
-                
-                # Take all available questions if category has fewer than requested
-                actual_count = min(count, available)
-                
-                cursor.execute("SELECT question, answer, image_path, choice_a, choice_b, choice_c, choice_d FROM questions WHERE category = ? ORDER BY RANDOM() LIMIT ?", 
-                             (category, actual_count))
-                category_questions = cursor.fetchall()
-                selected_questions.extend([(q, a, category, img, ca, cb, cc, cd) for q, a, img, ca, cb, cc, cd in category_questions])
-                
-                debug_info.append(f"{category}: wanted {count}, available {available}, got {len(category_questions)}")
-        
-        # If we don't have enough questions, try to fill from other categories
-        if len(selected_questions) < total_questions:
-            shortage = total_questions - len(selected_questions)
-            
-            # Get additional questions from any category
-            cursor.execute("SELECT question, answer, image_path, choice_a, choice_b, choice_c, choice_d, category FROM questions ORDER BY RANDOM() LIMIT ?", 
-                         (shortage * 2,))  # Get extra to avoid duplicates
-            additional_questions = cursor.fetchall()
-            
-            # Add non-duplicate questions
-            existing_questions = {(q[0], q[1]) for q in selected_questions}  # (question, answer) pairs
+        total_questions = exam_engine.TOTAL_QUESTIONS
+        if self.bilingual_var.get():
+            translated_pool = self.get_translated_question_pool()
+            if translated_pool is None:
+                return
+            # One selection pass gives both versions the same questions, order and Test ID
+            pairs, report = exam_engine.generate_paired_batch(pool, translated_pool, [name], total_questions)
+            self.current_test, self.current_test_translation = pairs[0]
+        else:
+            questions_per_category = exam_engine.apportion_questions(pool.category_settings, pool.category_counts(),
+                                                                     total_questions)
+            selected_questions = exam_engine.select_questions(pool, questions_per_category, total_questions)
             
-            for q, a, img, ca, cb, cc, cd, cat in additional_questions:
-                if (q, a) not in existing_questions and len(selected_questions) < total_questions:
-                    selected_questions.append((q, a, cat, img, ca, cb, cc, cd))  # Fixed parameter order: category before image
-                    existing_questions.add((q, a))
-        
-        if len(selected_questions) < total_questions:
-            messagebox.showwarning("Warning", f"Only {len(selected_questions)} questions available. Need {total_questions}")
-        
-        # Shuffle all questions
-        random.shuffle(selected_questions)
-        
-        # Generate test content with unique ID
-        test_id = str(uuid.uuid4())[:8].upper()  # Short 8-character ID
-        self.current_test = {
-            'name': name,
-            'date': datetime.now().strftime("%B %d, %Y"),
-            'id': test_id,
-            'questions': selected_questions
-        }
+            # Generate test content with unique ID
+            self.current_test = exam_engine.build_exam(name, selected_questions)
+            self.current_test_translation = None
+        
+        if len(self.current_test['questions']) < total_questions:
+            messagebox.showwarning("Warning", f"Only {len(self.current_test['questions'])} questions available. Need {total_questions}")
         
         # Display in preview
         self.display_test_preview()
+        if self.bilingual_var.get():
+            self.test_preview.insert(1.0, f"{self.get_other_language()} version ready with the same questions "
+                                          f"(untranslated questions left out: {report['untranslated']}).\n"
+                                          f"Export to PDF and Export Answer Key save both versions.\n")
+    
+    def generate_batch_from_roster(self):
+        """Generate one test per name in a roster file (CSV, Excel or plain list)"""
+        filepath = filedialog.askopenfilename(
+            title="Select Class Roster",
+            filetypes=[("Roster files", "*.csv *.txt *.xlsx *.xls"), ("All files", "*.*")]
+        )
+        if not filepath:
+            return
+        
+        try:
+            names = exam_engine.read_roster(filepath)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not read roster: {str(e)}")
+            return
+        
+        if not names:
+            messagebox.showerror("Error", "No test taker names found in the roster")
+            return
+        
+        # Load the question pool once for the whole class (reused if already cached)
+        load_start = time.perf_counter()
+        pool = self.get_question_pool()
+        load_seconds = time.perf_counter() - load_start
+        
+        if not pool.category_settings:
+            messagebox.showerror("Error", "No category settings configured")
+            return
+        
+        if self.bilingual_var.get():
+            translated_pool = self.get_translated_question_pool()
+            if translated_pool is None:
+                return
+            pairs, report = exam_engine.generate_paired_batch(pool, translated_pool, names)
+            exams = [exam for exam, _ in pairs]
+            self.current_batch_translations = [translation for _, translation in pairs]
+        else:
+            exams, report = exam_engine.generate_batch(pool, names)
+            self.current_batch_translations = None
+        self.current_batch = exams
+        
+        # Show the roster with test IDs and the timing report
+        self.test_preview.delete(1.0, tk.END)
+        batch_content = f"Class Batch: {os.path.basename(filepath)}\n"
+        batch_content += exam_engine.format_batch_report(report, load_seconds) + "\n"
+        batch_content += "=" * 60 + "\n\n"
+        for i, exam in enumerate(exams, 1):
+            batch_content += f"{i:>3}. {exam['name']:<40} Test ID: {exam['id']}  ({len(exam['questions'])} questions)\n"
+        self.test_preview.insert(1.0, batch_content)
+        
+        if report['short_exams']:
+            messagebox.showwarning("Warning", f"Only {report['pool_size']} questions available. Need {exam_engine.TOTAL_QUESTIONS}")
     
     def display_test_preview(self):
         """Display the generated test in the preview area"""
         self.test_preview.delete(1.0, tk.END)
         
         test_content = f"""
-Journey-Level Proficiency Exam
+{self.get_exam_title()}
 Name: {self.current_test['name']}
 Date: {self.current_test['date']}                                          Test ID: {self.current_test['id']}
 
@@ -1086,6 +1114,8 @@ that best answers the question or completes the statement. Show all work.
         if not hasattr(self, 'current_test'):
             messagebox.showerror("Error", "No test generated yet")
             return
+        if self.export_in_progress():
+            return
         
         filename = f"Test_{self.current_test['name']}_ID{self.current_test['id']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         filepath = filedialog.asksaveasfilename(
@@ -1095,17 +1125,15 @@ that best answers the question or completes the statement. Show all work.
         )
         
         if filepath:
-            try:
-                self.create_pdf(filepath)
-                messagebox.showinfo("Success", f"Test exported to {os.path.basename(filepath)}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to create PDF: {str(e)}")
+            self.start_exam_export(filepath, answer_key=False)
     
     def export_answer_key(self):
         """Export the answer key to PDF"""
         if not hasattr(self, 'current_test'):
             messagebox.showerror("Error", "No test generated yet")
             return
+        if self.export_in_progress():
+            return
         
         filename = f"AnswerKey_{self.current_test['name']}_ID{self.current_test['id']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         filepath = filedialog.asksaveasfilename(
@@ -1115,476 +1143,167 @@ that best answers the question or completes the statement. Show all work.
         )
         
         if filepath:
-            try:
-                self.create_answer_key_pdf(filepath)
-                messagebox.showinfo("Success", f"Answer key exported to {os.path.basename(filepath)}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to create answer key: {str(e)}")
+            self.start_exam_export(filepath, answer_key=True)
     
-    def create_answer_key_pdf(self, filepath):
-        """Create PDF answer key - same format as test but with correct answers filled in"""
-        c = canvas.Canvas(filepath, pagesize=letter)
-        width, height = letter
-        
-        # Header with dynamic exam title
-        c.setFont("Helvetica-Bold", 16)
-        exam_title = self.get_exam_title()
-        c.drawString(50, height - 50, f"{exam_title} - ANSWER KEY")
+    def export_in_progress(self):
+        """Tell the user if an export is already running (only one runs at a time)"""
+        if getattr(self, 'export_thread', None) and self.export_thread.is_alive():
+            messagebox.showinfo("Export", "An export is already running. Wait for it to finish or cancel it.")
+            return True
+        return False
+    
+    def start_export(self, worker, status_text, maximum=None):
+        """Run an export worker in a background thread and show its progress
         
-        c.setFont("Helvetica", 12)
-        c.drawString(50, height - 80, f"Name: {self.current_test['name']}")
-        c.drawString(50, height - 100, f"Date: {self.current_test['date']}")
+        The worker gets (post, cancel_event) and reports with post(kind, ...);
+        poll_export applies the messages on the Tk thread. Without a maximum the
+        progress bar runs in indeterminate mode until the first progress message.
+        """
+        self.export_queue = queue.Queue()
+        self.export_cancel = Event()
         
-        # Answer Key ID prominently displayed
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(400, height - 80, f"Test ID: {self.current_test['id']}")
+        if maximum:
+            self.export_progress.configure(mode='determinate', maximum=maximum, value=0)
+        else:
+            self.export_progress.configure(mode='indeterminate', value=0)
+            self.export_progress.start(15)
+        self.export_progress_label.config(text=status_text)
+        self.export_progress_frame.pack(pady=5)
+        
+        def post(kind, *args):
+            self.export_queue.put((kind,) + args)
+        
+        # Render in a background thread so the window keeps responding
+        self.export_thread = Thread(target=worker, args=(post, self.export_cancel), daemon=True)
+        self.export_thread.start()
+        self.root.after(100, self.poll_export)
+    
+    def start_exam_export(self, filepath, answer_key):
+        """Write the current test or its answer key to filepath in the background
         
-        c.setFont("Helvetica", 12)
-        c.drawString(50, height - 120, "Instructions: Correct answers are filled in.")
+        A paired test also has its other-language version written next to it,
+        with that language's tag added to the file name.
+        """
+        documents = [(self.current_test, filepath, self.get_exam_title())]
+        translation = getattr(self, 'current_test_translation', None)
+        if translation is not None:
+            root, ext = os.path.splitext(filepath)
+            documents.append((translation, f"{root}_{self.get_language_tags()[1]}{ext}",
+                              self.get_exam_title(self.get_other_language())))
+        layouts = [layout for layout in (getattr(self, 'current_layout', None),
+                                         getattr(self, 'current_translation_layout', None)) if layout is not None]
+        images_dir = self.images_dir
+        document = "Answer key" if answer_key else "Test"
+        
+        def worker(post, cancel_event):
+            saved = []
+            try:
+                for exam, path, exam_title in documents:
+                    layout = next((layout for layout in layouts if layout['exam'] is exam), None)
+                    if layout is None:
+                        layout = exam_pdf.layout_exam(exam, images_dir, cancel_event)
+                        post('layout', layout)
+                    exam_pdf.render_exam_pdf(path, layout, exam_title, answer_key,
+                                             progress_callback=lambda page, pages: post(
+                                                 'progress', page, pages, f"Drawing page {page} of {pages}..."),
+                                             cancel_event=cancel_event)
+                    saved.append(os.path.basename(path))
+                post('done', f"{document} exported to {' and '.join(saved)}")
+            except exam_pdf.ExportCancelled:
+                if saved:
+                    post('cancelled', f"{document} export cancelled. Only {' and '.join(saved)} was written.")
+                else:
+                    post('cancelled', f"{document} export cancelled. No file was written.")
+            except Exception as e:
+                message = f"Failed to create {document.lower()}: {str(e)}"
+                if saved:
+                    message += f"\n\n{' and '.join(saved)} was written."
+                post('error', message)
         
-        # Two column layout - same as main test
-        column_width = (width - 120) // 2  # Account for margins
-        left_column_x = 50
-        right_column_x = left_column_x + column_width + 20
-        left_y = height - 160
-        right_y = height - 160
+        self.start_export(worker, "Preparing questions and images...")
+    
+    def export_batch_pdfs(self):
+        """Export every test and answer key in the current batch to a folder"""
+        if not getattr(self, 'current_batch', None):
+            messagebox.showerror("Error", "No class batch generated yet")
+            return
+        if self.export_in_progress():
+            return
         
-        c.setFont("Helvetica", 11)
+        output_dir = filedialog.askdirectory(title="Select Output Folder for Batch PDFs")
+        if not output_dir:
+            return
         
-        # Process questions in two columns - fill left column completely first, then right column
-        total_questions = len(self.current_test['questions'])
-        use_right_column = False  # Start with left column
+        exams = list(self.current_batch)
+        translations = getattr(self, 'current_batch_translations', None)
+        exam_title = self.get_exam_title()
+        translated_title = self.get_exam_title(self.get_other_language())
+        language_tags = self.get_language_tags()
+        images_dir = self.images_dir
+        # Paired batches write both versions of every exam
+        documents = len(exams) * 2 if translations else len(exams)
         
-        for i, (question, answer, category, image_path, choice_a, choice_b, choice_c, choice_d) in enumerate(self.current_test['questions'], 1):
-            # Use left column unless we've switched to right column
-            is_left_column = not use_right_column
-            
-            if is_left_column:
-                current_x = left_column_x
-                current_y = left_y
-            else:
-                current_x = right_column_x
-                current_y = right_y
-            # Calculate space needed for this question
-            choices_count = sum([1 for choice in [choice_a, choice_b, choice_c, choice_d] if choice])
-            image_height = 0
-            
-            # Check image size if present
-            if image_path:
-                full_image_path = self.get_image_full_path(image_path)
-                if full_image_path and os.path.exists(full_image_path):
-                    try:
-                        img = Image.open(full_image_path)
-                        img_width, img_height = img.size
-                        
-                        # Scale image to fit column width
-                        max_img_width = column_width - 20
-                        max_img_height = 100
-                        scale_w = max_img_width / img_width
-                        scale_h = max_img_height / img_height
-                        scale = min(scale_w, scale_h, 1.0)
-                        image_height = int(img_height * scale)
-                    except:
-                        image_height = 20
-            
-            # Calculate total space needed (accounting for wrapped answers and new spacing)
-            estimated_choice_lines = 0
-            for choice_text in [choice_a, choice_b, choice_c, choice_d]:
-                if choice_text:
-                    choice_length = len(f"a. {choice_text}")
-                    lines_needed = max(1, (choice_length // 40) + 1)  # Adjusted for balanced columns
-                    estimated_choice_lines += lines_needed
+        def worker(post, cancel_event):
+            def progress(done, total, exam_id):
+                post('progress', done, total, f"Rendering {done} of {total}...")
             
-            space_needed = 45 + image_height + (estimated_choice_lines * 14) + 35  # Updated for new font and spacing
-            
-            # Check if left column has space, if not switch to right column
-            if is_left_column and left_y < space_needed and not use_right_column:
-                # Switch to right column if left column is full
-                use_right_column = True
-                is_left_column = False
-                current_x = right_column_x
-                current_y = right_y
-            
-            # Check if we need a new page (both columns full)
-            if current_y < space_needed:
-                c.showPage()
-                # Reset header for new page
-                c.setFont("Helvetica-Bold", 16)
-                title_text = f"{self.get_exam_title()} - ANSWER KEY (continued)"
-                title_width = c.stringWidth(title_text, "Helvetica-Bold", 16)
-                c.drawString((width - title_width) / 2, height - 40, title_text)
-                
-                # Add Test ID to continuation page
-                c.setFont("Helvetica-Bold", 12)
-                id_text = f"Test ID: {self.current_test['id']}"
-                id_width = c.stringWidth(id_text, "Helvetica-Bold", 12)
-                c.drawString((width - id_width) / 2, height - 60, id_text)
-                
-                left_y = height - 90  # Adjusted for Test ID
-                right_y = height - 90  # Adjusted for Test ID
-                current_y = height - 90  # Adjusted for Test ID
-                use_right_column = False  # Reset to left column on new page
-                is_left_column = True
-                current_x = left_column_x
-                c.setFont("Helvetica", 11)  # Match updated font - regular but larger
-            # Draw question text
-            question_text = f"{i}. {question}"
-            
-            # Word wrap for column width (adjusted for balanced columns)
-            max_chars = 48 if column_width < 270 else 52
-            if len(question_text) > max_chars:
-                words = question_text.split()
-                lines = []
-                current_line = ""
-                
-                for word in words:
-                    if len(current_line + " " + word) <= max_chars:
-                        current_line += (" " if current_line else "") + word
-                    else:
-                        lines.append(current_line)
-                        current_line = word
-                
-                if current_line:
-                    lines.append(current_line)
-                
-                for line in lines:
-                    c.drawString(current_x, current_y, line)
-                    current_y -= 14  # Increased for better spacing with bold font
-            else:
-                c.drawString(current_x, current_y, question_text)
-                current_y -= 14  # Increased for better spacing with bold font
-            
-            # Draw image if present
-            if image_path:
-                full_image_path = self.get_image_full_path(image_path)
-                if full_image_path and os.path.exists(full_image_path):
-                    try:
-                        img = Image.open(full_image_path)
-                        img_width, img_height = img.size
-                        
-                        # Scale image to fit column width
-                        max_img_width = column_width - 20
-                        max_img_height = 100
-                        scale_w = max_img_width / img_width
-                        scale_h = max_img_height / img_height
-                        scale = min(scale_w, scale_h, 1.0)
-                        
-                        new_width = int(img_width * scale)
-                        new_height = int(img_height * scale)
-                        
-                        # Center image in column
-                        img_x = current_x + (column_width - new_width) // 2
-                        img_y = current_y - new_height - 10
-                        
-                        c.drawInlineImage(full_image_path, img_x, img_y, width=new_width, height=new_height)
-                        current_y = img_y - 10  # Continue after image
-                        
-                    except Exception as e:
-                        print(f"Debug (Answer Key): Failed to load image {full_image_path}: {str(e)}")
-                        c.drawString(current_x, current_y - 15, f"[Image: {os.path.basename(image_path)} - Error loading]")
-                        current_y -= 25
-                else:
-                    print(f"Debug (Answer Key): Image path '{image_path}' not found")
-                    c.drawString(current_x, current_y - 15, f"[Image: {os.path.basename(image_path)} - Not found]")
-                    current_y -= 25
-            
-            # Multiple choice options with proper column positioning
-            current_y -= 10
-            choices = []
-            if choice_a: choices.append(('a', choice_a))
-            if choice_b: choices.append(('b', choice_b))
-            if choice_c: choices.append(('c', choice_c))
-            if choice_d: choices.append(('d', choice_d))
-            
-            for choice_letter, choice_text in choices:
-                # Draw circle for choice - same size as test circles (radius 3)
-                if choice_letter.lower() == answer.lower():
-                    c.circle(current_x + 5, current_y + 3, 3, fill=1)  # Filled circle for correct answer
+            try:
+                if translations:
+                    written = exam_pdf.render_paired_batch(list(zip(exams, translations)), output_dir, exam_title,
+                                                           translated_title, language_tags, images_dir,
+                                                           progress_callback=progress, cancel_event=cancel_event)
                 else:
-                    c.circle(current_x + 5, current_y + 3, 3, fill=0)  # Empty circle
-                
-                # Word wrap the choice text
-                choice_with_letter = f"{choice_letter}. {choice_text}"
-                max_choice_chars = 40  # Adjusted for balanced column width
-                
-                if len(choice_with_letter) > max_choice_chars:
-                    # Split into words and wrap
-                    words = choice_with_letter.split()
-                    lines = []
-                    current_line = ""
-                    
-                    for word in words:
-                        if len(current_line + " " + word) <= max_choice_chars:
-                            current_line += (" " if current_line else "") + word
-                        else:
-                            if current_line:
-                                lines.append(current_line)
-                            current_line = word
-                    
-                    if current_line:
-                        lines.append(current_line)
-                    
-                    # Draw first line with circle
-                    c.drawString(current_x + 15, current_y, lines[0])
-                    current_y -= 14  # Increased line spacing
-                    
-                    # Draw remaining lines indented
-                    for line in lines[1:]:
-                        c.drawString(current_x + 15, current_y, line)
-                        current_y -= 14  # Increased line spacing
+                    written = exam_pdf.render_batch(exams, output_dir, exam_title, images_dir,
+                                                    progress_callback=progress, cancel_event=cancel_event)
+                if cancel_event.is_set():
+                    post('cancelled', f"Batch export cancelled after {len(written)} of {documents} "
+                                      f"tests and answer keys.\nFiles written so far are in:\n{output_dir}")
                 else:
-                    # Choice fits on one line
-                    c.drawString(current_x + 15, current_y, choice_with_letter)
-                    current_y -= 14  # Increased line spacing to match bold font
-            
-            current_y -= 35  # Further increased space between questions to match example
-            
-            # Update column positions
-            if is_left_column:
-                left_y = current_y
-            else:
-                right_y = current_y
-        
-        c.save()
-    
-    def create_pdf(self, filepath):
-        """Create PDF file of the test"""
-        c = canvas.Canvas(filepath, pagesize=letter)
-        width, height = letter
-        
-        # Header - Dynamic based on database mode
-        c.setFont("Helvetica-Bold", 16)
-        title_text = self.get_exam_title()
-        title_width = c.stringWidth(title_text, "Helvetica-Bold", 16)
-        c.drawString((width - title_width) / 2, height - 40, title_text)
-        
-        # Test ID centered below title
-        c.setFont("Helvetica-Bold", 12)
-        id_text = f"Test ID: {self.current_test['id']}"
-        id_width = c.stringWidth(id_text, "Helvetica-Bold", 12)
-        c.drawString((width - id_width) / 2, height - 60, id_text)
-        
-        # Name and Date line
-        c.setFont("Helvetica", 12)
-        name_date_line = f"Name: {self.current_test['name']}                                          Date: {self.current_test['date']}"
-        c.drawString(50, height - 90, name_date_line)
-        
-        # Draw line under name/date
-        c.line(50, height - 95, width - 50, height - 95)
-        
-        # Total Points
-        c.setFont("Helvetica", 12)
-        total_points_text = f"Total Points: {len(self.current_test['questions'])}"
-        total_width = c.stringWidth(total_points_text, "Helvetica", 12)
-        c.drawString((width - total_width) / 2, height - 115, total_points_text)
-        
-        # Directions
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(50, height - 145, "Directions:")
-        c.setFont("Helvetica", 11)
-        c.drawString(120, height - 145, "For the following questions, fill the circle")
-        c.drawString(50, height - 160, "next to the option that BEST answers the question or")
-        c.drawString(50, height - 175, "completes the statement. Show all work.")
-        
-        # Setup two-column layout with moderate spacing between columns
-        left_column_x = 50
-        right_column_x = width / 2 + 14  # 14 points spacing between columns
-        column_width = width / 2 - 64    # Adjusted for 14-point spacing
-        
-        questions_start_y = height - 210
-        left_y = questions_start_y
-        right_y = questions_start_y
-        
-        c.setFont("Helvetica", 11)  # Regular font but larger size for darker appearance
-        
-        # Process questions in two columns - fill left column completely first, then right column
-        total_questions = len(self.current_test['questions'])
-        use_right_column = False  # Start with left column
+                    post('done', f"Exported {len(written)} tests and answer keys to:\n{output_dir}")
+            except Exception as e:
+                post('error', f"Failed to create batch PDFs: {str(e)}")
         
-        for i, (question, answer, category, image_path, choice_a, choice_b, choice_c, choice_d) in enumerate(self.current_test['questions'], 1):
-            # Use left column unless we've switched to right column
-            is_left_column = not use_right_column
-            
-            if is_left_column:
-                current_x = left_column_x
-                current_y = left_y
-            else:
-                current_x = right_column_x
-                current_y = right_y
-            
-            # Calculate space needed for this question
-            choices_count = sum([1 for c in [choice_a, choice_b, choice_c, choice_d] if c])
-            image_height = 0
-            
-            # Check image size if present
-            if image_path:
-                full_image_path = self.get_image_full_path(image_path)
-                if full_image_path and os.path.exists(full_image_path):
-                    try:
-                        img = Image.open(full_image_path)
-                        img_width, img_height = img.size
-                        
-                        # Scale image to fit column width
-                        max_img_width = column_width - 20
-                        max_img_height = 100
-                        scale_w = max_img_width / img_width
-                        scale_h = max_img_height / img_height
-                        scale = min(scale_w, scale_h, 1.0)
-                        image_height = int(img_height * scale)
-                    except:
-                        image_height = 20
-            
-            # Calculate total space needed (accounting for wrapped answers and new spacing)
-            estimated_choice_lines = 0
-            for choice_text in [choice_a, choice_b, choice_c, choice_d]:
-                if choice_text:
-                    choice_length = len(f"a. {choice_text}")
-                    lines_needed = max(1, (choice_length // 40) + 1)  # Adjusted for balanced columns
-                    estimated_choice_lines += lines_needed
-            
-            space_needed = 45 + image_height + (estimated_choice_lines * 14) + 35  # Updated for new font and spacing
-            
-            # Check if left column has space, if not switch to right column
-            if is_left_column and left_y < space_needed and not use_right_column:
-                # Switch to right column if left column is full
-                use_right_column = True
-                is_left_column = False
-                current_x = right_column_x
-                current_y = right_y
-            
-            # Check if we need a new page (both columns full)
-            if current_y < space_needed:
-                c.showPage()
-                # Reset header for new page
-                c.setFont("Helvetica-Bold", 16)
-                title_text = f"{self.get_exam_title()} (continued)"
-                title_width = c.stringWidth(title_text, "Helvetica-Bold", 16)
-                c.drawString((width - title_width) / 2, height - 40, title_text)
-                
-                # Add Test ID to continuation page
-                c.setFont("Helvetica-Bold", 12)
-                id_text = f"Test ID: {self.current_test['id']}"
-                id_width = c.stringWidth(id_text, "Helvetica-Bold", 12)
-                c.drawString((width - id_width) / 2, height - 60, id_text)
-                
-                left_y = height - 90  # Adjusted for Test ID
-                right_y = height - 90  # Adjusted for Test ID
-                current_y = height - 90  # Adjusted for Test ID
-                use_right_column = False  # Reset to left column on new page
-                is_left_column = True
-                current_x = left_column_x
-                c.setFont("Helvetica", 11)  # Match updated font - regular but larger
-            
-            # Draw question text
-            question_text = f"{i}. {question}"
-            
-            # Word wrap for column width (adjusted for balanced columns)
-            max_chars = 48 if column_width < 270 else 52
-            if len(question_text) > max_chars:
-                words = question_text.split()
-                lines = []
-                current_line = ""
-                
-                for word in words:
-                    if len(current_line + " " + word) <= max_chars:
-                        current_line += (" " if current_line else "") + word
-                    else:
-                        lines.append(current_line)
-                        current_line = word
-                
-                if current_line:
-                    lines.append(current_line)
-                
-                for line in lines:
-                    c.drawString(current_x, current_y, line)
-                    current_y -= 14  # Increased for better spacing with bold font
-            else:
-                c.drawString(current_x, current_y, question_text)
-                current_y -= 14  # Increased for better spacing with bold font
-            
-            # Draw image if present
-            if image_path:
-                full_image_path = self.get_image_full_path(image_path)
-                if full_image_path and os.path.exists(full_image_path):
-                    try:
-                        img = Image.open(full_image_path)
-                        img_width, img_height = img.size
-                        
-                        # Scale image to fit column
-                        max_img_width = column_width - 20
-                        max_img_height = 100
-                        scale_w = max_img_width / img_width
-                        scale_h = max_img_height / img_height
-                        scale = min(scale_w, scale_h, 1.0)
-                        
-                        new_width = int(img_width * scale)
-                        new_height = int(img_height * scale)
-                        
-                        img_x = current_x + 10
-                        img_y = current_y - new_height - 5
-                        
-                        c.drawImage(full_image_path, img_x, img_y, width=new_width, height=new_height)
-                        current_y = img_y - 10
-                        
-                    except Exception as e:
-                        c.drawString(current_x, current_y - 10, f"[Image error]")
-                        current_y -= 15
-            
-            # Draw multiple choice options with word wrapping
-            current_y -= 5
-            choices = []
-            if choice_a: choices.append(('a', choice_a))
-            if choice_b: choices.append(('b', choice_b))
-            if choice_c: choices.append(('c', choice_c))
-            if choice_d: choices.append(('d', choice_d))
-            
-            for choice_letter, choice_text in choices:
-                # Add circle for students to fill in
-                c.circle(current_x + 5, current_y + 3, 3, fill=0)
-                
-                # Word wrap the choice text
-                choice_with_letter = f"{choice_letter}. {choice_text}"
-                max_choice_chars = 40  # Adjusted for balanced column width
-                
-                if len(choice_with_letter) > max_choice_chars:
-                    # Split into words and wrap
-                    words = choice_with_letter.split()
-                    lines = []
-                    current_line = ""
-                    
-                    for word in words:
-                        if len(current_line + " " + word) <= max_choice_chars:
-                            current_line += (" " if current_line else "") + word
-                        else:
-                            if current_line:
-                                lines.append(current_line)
-                            current_line = word
-                    
-                    if current_line:
-                        lines.append(current_line)
-                    
-                    # Draw first line with circle
-                    c.drawString(current_x + 15, current_y, lines[0])
-                    current_y -= 14  # Increased line spacing
-                    
-                    # Draw remaining lines indented
-                    for line in lines[1:]:
-                        c.drawString(current_x + 15, current_y, line)
-                        current_y -= 14  # Increased line spacing
+        self.start_export(worker, f"Rendering 0 of {documents}...", maximum=documents)
+    
+    def cancel_export(self):
+        """Ask the running export to stop at the next page (or exam in a batch)"""
+        if getattr(self, 'export_thread', None) and self.export_thread.is_alive():
+            self.export_cancel.set()
+            self.export_progress_label.config(text="Cancelling...")
+    
+    def poll_export(self):
+        """Apply export messages posted by the worker thread"""
+        try:
+            while True:
+                message = self.export_queue.get_nowait()
+                kind = message[0]
+                if kind == 'progress':
+                    done, total, text = message[1:]
+                    if str(self.export_progress.cget('mode')) != 'determinate':
+                        self.export_progress.stop()
+                        self.export_progress.configure(mode='determinate')
+                    self.export_progress.configure(maximum=total, value=done)
+                    if not self.export_cancel.is_set():
+                        self.export_progress_label.config(text=text)
+                elif kind == 'layout':
+                    # Keep the layout so exporting the other document reuses it
+                    if getattr(self, 'current_test', None) is message[1]['exam']:
+                        self.current_layout = message[1]
+                    elif getattr(self, 'current_test_translation', None) is message[1]['exam']:
+                        self.current_translation_layout = message[1]
                 else:
-                    # Choice fits on one line
-                    c.drawString(current_x + 15, current_y, choice_with_letter)
-                    current_y -= 14  # Increased line spacing to match bold font
-            
-            current_y -= 35  # Further increased space between questions to match example
-            
-            # Update column positions
-            if is_left_column:
-                left_y = current_y
-            else:
-                right_y = current_y
-        
-        c.save()
+                    self.export_progress.stop()
+                    self.export_progress_frame.pack_forget()
+                    if kind == 'done':
+                        messagebox.showinfo("Success", message[1])
+                    elif kind == 'cancelled':
+                        messagebox.showinfo("Export Cancelled", message[1])
+                    else:
+                        messagebox.showerror("Error", message[1])
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(100, self.poll_export)
     
     def clear_preview(self):
         """Clear the test preview"""
@@ -1605,23 +1324,11 @@ that best answers the question or completes the statement. Show all work.
         )
         
         if filepath:
-            # Copy image to images directory
-            # Create unique filename
-            filename = os.path.basename(filepath)
-            name, ext = os.path.splitext(filename)
-            counter = 1
-            new_filepath = os.path.join(self.images_dir, filename)
-            
-            while os.path.exists(new_filepath):
-                new_filename = f"{name}_{counter}{ext}"
-                new_filepath = os.path.join(self.images_dir, new_filename)
-                counter += 1
-            
             try:
-                shutil.copy2(filepath, new_filepath)
-                # Store relative path from program directory
-                relative_path = os.path.relpath(new_filepath, get_application_path())
+                # Keep the original and store a print-ready copy for the PDFs
+                relative_path, original_path = question_images.ingest_image(filepath, self.images_dir)
                 self.image_path_var.set(relative_path)
+                self.image_original_path = original_path
                 messagebox.showinfo("Success", f"Image copied to: {relative_path}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to copy image: {str(e)}")
@@ -1629,13 +1336,14 @@ that best answers the question or completes the statement. Show all work.
     def clear_image(self):
         """Clear the selected image"""
         self.image_path_var.set("")
+        self.image_original_path = None
 
     def open_add_question_dialog(self, edit_data=None):
         """Open a popup dialog to add a new question or edit existing one"""
         is_editing = edit_data is not None
         dialog = tk.Toplevel(self.root)
         dialog.title("Edit Question" if is_editing else "Add New Question")
-        dialog.geometry("800x580")  # Optimized height - no wasted space
+        dialog.geometry("800x620")  # Optimized height - no wasted space
         dialog.resizable(True, True)
         dialog.transient(self.root)
         dialog.grab_set()
@@ -1705,6 +1413,8 @@ that best answers the question or completes the statement. Show all work.
         image_entry = ttk.Entry(form_frame, textvariable=image_var, style='Modern.TEntry', width=35, state="readonly")
         image_entry.grid(row=7, column=1, pady=6, padx=4, sticky="ew")
         
+        image_original = {'path': None}  # Full-size original kept next to the print copy
+        
         def browse_image():
             file_path = filedialog.askopenfilename(
                 title="Select Image",
@@ -1713,27 +1423,33 @@ that best answers the question or completes the statement. Show all work.
             if file_path:
                 # Convert to relative path for images folder
                 if not file_path.startswith('images/') and not file_path.startswith('images\\'):
-                    filename = os.path.basename(file_path)
-                    # Copy to images directory
-                    dest_path = os.path.join(self.images_dir, filename)
+                    # Copy the original and a downscaled print copy to the images directory
                     try:
-                        import shutil
-                        shutil.copy2(file_path, dest_path)
-                        image_var.set(f"images/{filename}")
+                        relative_path, original_path = question_images.ingest_image(file_path, self.images_dir)
+                        image_var.set(relative_path)
+                        image_original['path'] = original_path
                     except Exception as e:
                         messagebox.showerror("Error", f"Could not copy image: {e}")
                 else:
                     image_var.set(file_path)
+                    image_original['path'] = None
         
         def clear_image():
             image_var.set("")
+            image_original['path'] = None
         
         ttk.Button(form_frame, text="📁 Browse", command=browse_image, style="Primary.TButton").grid(row=7, column=2, pady=6, padx=(8, 4))
         ttk.Button(form_frame, text="🗑️ Clear", command=clear_image, style="Warning.TButton").grid(row=7, column=3, pady=6, padx=(4, 12))
         
+        # Translation key - the same key links this question to its translation in the other language's bank
+        ttk.Label(form_frame, text="🌐 Translation Key:", style='Subheading.TLabel').grid(row=8, column=0, sticky="w", pady=6, padx=(12, 8))
+        translation_key_entry = ttk.Entry(form_frame, style='Modern.TEntry', width=30)
+        translation_key_entry.grid(row=8, column=1, pady=6, padx=4, sticky="w")
+        ttk.Label(form_frame, text="(optional)", font=("Segoe UI", 9), foreground='#6C757D').grid(row=8, column=2, sticky="w", padx=4)
+        
         # Populate fields if editing
         if is_editing:
-            question_id, question_text, answer, category, choice_a, choice_b, choice_c, choice_d, image_path = edit_data
+            question_id, question_text, answer, category, choice_a, choice_b, choice_c, choice_d, image_path, image_original_path, translation_key = edit_data
             
             # Populate question text
             question_entry.insert(1.0, question_text)
@@ -1757,6 +1473,10 @@ that best answers the question or completes the statement. Show all work.
             # Populate image path
             if image_path:
                 image_var.set(image_path)
+                image_original['path'] = image_original_path
+            
+            if translation_key:
+                translation_key_entry.insert(0, translation_key)
         
         # Buttons - tight spacing, no wasted space
         button_frame = ttk.Frame(content_frame)
@@ -1771,6 +1491,8 @@ that best answers the question or completes the statement. Show all work.
             choice_c = choice_c_entry.get().strip()
             choice_d = choice_d_entry.get().strip()
             image_path = image_var.get().strip() or None
+            image_original_path = image_original['path'] if image_path else None
+            translation_key = translation_key_entry.get().strip() or None
             
             # Validate
             if not all([question, answer, category, choice_a, choice_b]):
@@ -1788,32 +1510,58 @@ that best answers the question or completes the statement. Show all work.
                 messagebox.showerror("Error", f"Answer '{answer}' must correspond to a provided choice")
                 return
             
+            if self.import_blocks_writes():
+                return
+            
+            content_hash = question_db.question_content_hash(question, answer, choice_a, choice_b, choice_c, choice_d)
+            duplicate_id = question_db.find_duplicate_question(self.conn, content_hash,
+                                                               edit_data[0] if is_editing else None)
+            if duplicate_id is not None:
+                messagebox.showerror("Error", f"The same question is already in the bank (ID {duplicate_id})")
+                return
+            
+            if translation_key:
+                key_owner = question_db.find_translation_key_owner(self.conn, translation_key,
+                                                                   edit_data[0] if is_editing else None)
+                if key_owner is not None:
+                    messagebox.showerror("Error", f"Translation key '{translation_key}' is already used by question {key_owner}")
+                    return
+            
             try:
                 cursor = self.conn.cursor()
+                category_id = question_db.get_category_id(self.conn, category)
                 
                 if is_editing:
                     # Update existing question
                     question_id = edit_data[0]
                     cursor.execute('''
                         UPDATE questions 
-                        SET question = ?, answer = ?, category = ?, choice_a = ?, choice_b = ?, choice_c = ?, choice_d = ?, image_path = ?
+                        SET question = ?, answer = ?, category_id = ?, choice_a = ?, choice_b = ?, choice_c = ?, choice_d = ?, image_path = ?, image_original_path = ?, content_hash = ?, translation_key = ?
                         WHERE id = ?
-                    ''', (question, answer, category, choice_a, choice_b, choice_c, choice_d, image_path, question_id))
+                    ''', (question, answer, category_id, choice_a, choice_b, choice_c, choice_d, image_path, image_original_path, content_hash, translation_key, question_id))
                     success_message = "Question updated successfully!"
                 else:
                     # Insert new question
                     cursor.execute('''
-                        INSERT INTO questions (question, answer, category, choice_a, choice_b, choice_c, choice_d, image_path, created_date)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-                    ''', (question, answer, category, choice_a, choice_b, choice_c, choice_d, image_path))
+                        INSERT INTO questions (question, answer, category_id, choice_a, choice_b, choice_c, choice_d, image_path, image_original_path, content_hash, translation_key, created_date)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+                    ''', (question, answer, category_id, choice_a, choice_b, choice_c, choice_d, image_path, image_original_path, content_hash, translation_key))
                     success_message = "Question added successfully!"
                 
                 self.conn.commit()
+                self.invalidate_question_pool()
                 
+                # Update just this question in the main list
+                if is_editing:
+                    self.question_updated(question_id, edit_data[3], category)
+                else:
+                    self.question_added(cursor.lastrowid, category)
                 messagebox.showinfo("Success", success_message)
-                self.load_questions()  # Refresh the main list
                 dialog.destroy()
                 
+            except sqlite3.OperationalError as e:
+                self.conn.rollback()
+                messagebox.showerror("Error", f"The database is busy ({e}).\n\nPlease try again after the import finishes.")
             except Exception as e:
                 action = "update" if is_editing else "add"
                 messagebox.showerror("Error", f"Failed to {action} question: {e}")
@@ -1832,6 +1580,7 @@ that best answers the question or completes the statement. Show all work.
         choice_c = self.choice_c_entry.get().strip()
         choice_d = self.choice_d_entry.get().strip()
         image_path = self.image_path_var.get().strip() or None
+        image_original_path = getattr(self, 'image_original_path', None) if image_path else None
         
         # Validate required fields - at least Choice A and B must be provided
         if not all([question, answer, category, choice_a, choice_b]):
@@ -1849,11 +1598,23 @@ that best answers the question or completes the statement. Show all work.
             messagebox.showerror("Error", f"Answer must be one of the choices you provided: {', '.join(valid_answers)}")
             return
         
+        if self.import_blocks_writes():
+            return
+        
+        content_hash = question_db.question_content_hash(question, answer, choice_a, choice_b, choice_c, choice_d)
+        duplicate_id = question_db.find_duplicate_question(self.conn, content_hash)
+        if duplicate_id is not None:
+            messagebox.showerror("Error", f"The same question is already in the bank (ID {duplicate_id})")
+            return
+        
         cursor = self.conn.cursor()
-        cursor.execute("""INSERT INTO questions (question, answer, category, choice_a, choice_b, choice_c, choice_d, image_path) 
-                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                      (question, answer, category, choice_a, choice_b, choice_c, choice_d, image_path))
+        category_id = question_db.get_category_id(self.conn, category)
+        cursor.execute("""INSERT INTO questions (question, answer, category_id, choice_a, choice_b, choice_c, choice_d, image_path, image_original_path, content_hash) 
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                      (question, answer, category_id, choice_a, choice_b, choice_c, choice_d, image_path, image_original_path, content_hash))
+        question_id = cursor.lastrowid
         self.conn.commit()
+        self.invalidate_question_pool()
         
         # Clear form
         self.question_entry.delete(1.0, tk.END)
@@ -1864,59 +1625,329 @@ that best answers the question or completes the statement. Show all work.
         self.choice_c_entry.delete(0, tk.END)
         self.choice_d_entry.delete(0, tk.END)
         self.image_path_var.set("")
+        self.image_original_path = None
         
-        # Refresh questions list
-        self.load_questions()
+        # Show the new question without reloading the list
+        self.question_added(question_id, category)
         messagebox.showinfo("Success", "Question added successfully")
     
-    def load_questions(self):
-        """Load all questions into the treeview"""
-        # Clear existing items
-        for item in self.questions_tree.get_children():
-            self.questions_tree.delete(item)
+    def load_questions(self, first_page=False, recount=True):
+        """Load the current page of questions into the treeview
         
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT id, question, answer, category, created_date, image_path FROM questions ORDER BY id DESC")
+        The page is reloaded from its first row, so it picks up added, edited
+        and deleted questions. first_page=True starts again from the top.
+        recount=False keeps the question total, which this app's own edits
+        keep current, instead of counting the whole bank again.
+        """
+        # Any search still running is out of date now
+        self.search_generation += 1
         
-        for row in cursor.fetchall():
-            # Truncate long text for display
-            question_text = row[1][:60] + "..." if len(row[1]) > 60 else row[1]
-            answer_text = f"({row[2]})"  # Show answer as (A), (B), etc.
-            image_status = "✅" if row[5] and row[5].strip() else "❌"  # Check if image exists
-            
-            self.questions_tree.insert('', tk.END, values=(
-                row[0], question_text, answer_text, row[3], image_status, row[4][:10]  # Include image status in separate column
-            ))
+        try:
+            rows = []
+            if self.question_page and not first_page:
+                first = self.question_page[0]
+                rows = question_db.fetch_question_page(self.conn, self.question_sort, self.question_sort_descending,
+                                                       boundary=(first[7], first[0]), include_boundary=True)
+            if not rows:
+                rows = question_db.fetch_question_page(self.conn, self.question_sort, self.question_sort_descending)
+                self.question_page_offset = 0
+            if recount:
+                self.question_total = question_db.count_questions(self.conn)
+            self.show_question_page(rows)
+        except sqlite3.OperationalError as e:
+            self.show_database_busy(e)
+    
+    def show_database_busy(self, error):
+        """Report a question list read that failed because an import holds the database
+        
+        Only happens with journal_mode DELETE (see README); in WAL mode reads
+        never wait for a writer. The list is reloaded when the import finishes.
+        """
+        print(f"Question list not refreshed: {error}")
+        self.page_label.config(text="Database busy - the list will refresh when the import finishes")
+    
+    def show_question_page(self, rows):
+        """Display a page of the question list and update the page controls
+        
+        The total shown comes from self.question_total, so turning a page
+        costs the same however big the bank is.
+        """
+        self.question_page = rows
+        self.sync_question_tree(rows)
+        self.update_page_controls()
+    
+    def update_page_controls(self):
+        """Show the position of the current page and enable the page buttons that apply"""
+        rows = self.question_page
+        if rows:
+            first = self.question_page_offset + 1
+            self.page_label.config(text=f"Questions {first}-{first + len(rows) - 1} of {self.question_total}")
+        else:
+            self.page_label.config(text="No questions")
+        self.prev_page_button.config(state="normal" if self.question_page_offset > 0 else "disabled")
+        at_end = self.question_page_offset + len(rows) >= self.question_total
+        self.next_page_button.config(state="disabled" if at_end else "normal")
+    
+    def searching(self):
+        """Check whether the list is showing search results rather than a page"""
+        return bool(self.search_entry.get().strip())
+    
+    def question_added(self, question_id, category):
+        """Show a new question without reloading the list
+        
+        It goes at the top when the first page of the newest-first list is
+        showing; otherwise it will appear in its place when that page is loaded.
+        """
+        self.adjust_category_count(category, 1)
+        self.question_total += 1
+        if self.searching():
+            return
+        
+        if self.question_sort == 'ID' and self.question_sort_descending and self.question_page_offset == 0:
+            row = question_db.fetch_question_row(self.conn, question_id, self.question_sort)
+            values = self.question_tree_values(row)
+            iid = str(question_id)
+            self.questions_tree.insert('', 0, iid=iid, values=values)
+            self.question_tree_rows[iid] = values
+            self.question_page.insert(0, row)
+            
+            # Keep the page at its normal size
+            if len(self.question_page) > question_db.PAGE_SIZE:
+                dropped = str(self.question_page.pop()[0])
+                self.questions_tree.delete(dropped)
+                del self.question_tree_rows[dropped]
+        self.update_page_controls()
+    
+    def question_updated(self, question_id, old_category, new_category):
+        """Refresh one edited question in the list (if it is showing)"""
+        if old_category != new_category:
+            self.adjust_category_count(old_category, -1)
+            self.adjust_category_count(new_category, 1)
+        
+        iid = str(question_id)
+        if iid not in self.question_tree_rows:
+            return
+        row = question_db.fetch_question_row(self.conn, question_id, self.question_sort)
+        values = self.question_tree_values(row)
+        if self.searching():
+            # Keep the search snippet in the question column
+            values = (values[0], self.question_tree_rows[iid][1]) + values[2:]
+        self.questions_tree.item(iid, values=values)
+        self.question_tree_rows[iid] = values
+        self.question_page = [row if page_row[0] == question_id else page_row for page_row in self.question_page]
+    
+    def question_deleted(self, question_id, category):
+        """Remove one deleted question from the list"""
+        self.adjust_category_count(category, -1)
+        self.question_total -= 1
+        
+        iid = str(question_id)
+        if iid in self.question_tree_rows:
+            self.questions_tree.delete(iid)
+            del self.question_tree_rows[iid]
+        self.question_page = [row for row in self.question_page if row[0] != question_id]
+        if not self.searching():
+            if self.question_page:
+                self.update_page_controls()
+            else:
+                # Deleted the last question on this page
+                self.load_questions(recount=False)
+    
+    def adjust_category_count(self, category, delta):
+        """Update one category's question count in the settings tab without reloading it"""
+        count = self.category_counts.get(category, 0) + delta
+        if count <= 0:
+            self.category_counts.pop(category, None)
+            if category in self.category_widgets:
+                self.remove_category_widget(category)
+                self.layout_category_widgets()
+        elif category not in self.category_widgets:
+            self.category_counts[category] = count
+            row = self.conn.execute("SELECT percentage FROM categories WHERE name = ?",
+                                    (category,)).fetchone()
+            self.add_category_widget(category, count, row[0] if row else 0)
+            self.layout_category_widgets()
+        else:
+            self.category_counts[category] = count
+            self.update_category_widget(category, count)
+            self.update_percentage_total()
+    
+    def next_question_page(self):
+        """Show the page after the current one"""
+        if not self.question_page:
+            return
+        last = self.question_page[-1]
+        try:
+            rows = question_db.fetch_question_page(self.conn, self.question_sort, self.question_sort_descending,
+                                                   boundary=(last[7], last[0]))
+        except sqlite3.OperationalError as e:
+            self.show_database_busy(e)
+            return
+        if rows:
+            self.question_page_offset += len(self.question_page)
+            self.show_question_page(rows)
+    
+    def previous_question_page(self):
+        """Show the page before the current one"""
+        if not self.question_page:
+            return
+        first = self.question_page[0]
+        try:
+            rows = question_db.fetch_question_page(self.conn, self.question_sort, self.question_sort_descending,
+                                                   boundary=(first[7], first[0]), backwards=True)
+        except sqlite3.OperationalError as e:
+            self.show_database_busy(e)
+            return
+        if len(rows) < question_db.PAGE_SIZE:
+            # Reached the top of the list - show a full first page
+            self.load_questions(first_page=True, recount=False)
+            return
+        self.question_page_offset = max(0, self.question_page_offset - len(rows))
+        self.show_question_page(rows)
+    
+    def sort_questions_by(self, column):
+        """Sort the question list by a column; clicking the same column again reverses it"""
+        if column == self.question_sort:
+            self.question_sort_descending = not self.question_sort_descending
+        else:
+            self.question_sort = column
+            # Newest and highest first for IDs and dates, A-Z for text
+            self.question_sort_descending = column in ('ID', 'Date', 'Image')
+        
+        for col, text in self.question_column_headers.items():
+            if col == self.question_sort:
+                text += " ▼" if self.question_sort_descending else " ▲"
+            self.questions_tree.heading(col, text=text)
+        
+        # Search results are ordered by relevance, so sorting goes back to the full list
+        self.search_entry.delete(0, tk.END)
+        self.load_questions(first_page=True, recount=False)
+    
+    def question_tree_values(self, row):
+        """Format an (id, question, answer, category, created_date, image_path) row for the treeview"""
+        # Truncate long text for display
+        question_text = row[1][:60] + "..." if len(row[1]) > 60 else row[1]
+        answer_text = f"({row[2]})"  # Show answer as (A), (B), etc.
+        image_status = "✅" if row[5] and row[5].strip() else "❌"  # Check if image exists
+        
+        # Include image status in separate column
+        return (row[0], question_text, answer_text, row[3], image_status, row[4][:10])
+    
+    def sync_question_tree(self, rows):
+        """Make the treeview show rows, in order, touching only the items that differ
+        
+        Items are keyed by question ID. Rows that left the result are deleted in
+        one call, new ones inserted, changed ones updated in place, and kept
+        items are only moved when their order actually changed. Rows may carry a search
+        snippet as a seventh value, shown in place of the question text.
+        """
+        wanted = {}
+        order = []
+        for row in rows:
+            values = self.question_tree_values(row)
+            if len(row) > 6 and row[6]:
+                # Show the matching passage, with the matched words in [brackets]
+                values = (values[0], row[6]) + values[2:]
+            iid = str(row[0])
+            wanted[iid] = values
+            order.append(iid)
+        
+        stale = [iid for iid in self.question_tree_rows if iid not in wanted]
+        if stale:
+            self.questions_tree.delete(*stale)
+            for iid in stale:
+                del self.question_tree_rows[iid]
+        
+        # Put the items that stay into their new relative order first; inserting
+        # the new ones at their final index then yields the full order
+        kept = [iid for iid in order if iid in self.question_tree_rows]
+        if list(self.questions_tree.get_children()) != kept:
+            for index, iid in enumerate(kept):
+                self.questions_tree.move(iid, '', index)
+        
+        for index, iid in enumerate(order):
+            values = wanted[iid]
+            shown = self.question_tree_rows.get(iid)
+            if shown is None:
+                self.questions_tree.insert('', index, iid=iid, values=values)
+            elif shown != values:
+                self.questions_tree.item(iid, values=values)
+            self.question_tree_rows[iid] = values
+    
+    def on_search_typed(self, event=None):
+        """Search once typing pauses, so each keystroke doesn't start a query"""
+        if event is not None and event.keysym in ('Return', 'Up', 'Down', 'Left', 'Right', 'Shift_L', 'Shift_R',
+                                                  'Control_L', 'Control_R', 'Alt_L', 'Alt_R', 'Tab'):
+            return
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(200, self.search_questions)
     
     def search_questions(self):
-        """Search questions by keyword"""
+        """Search questions by keyword (full-text, ranked, matching word prefixes)
+        
+        The query runs on a background thread. Starting a new search interrupts
+        the one in progress, and only the newest search's results are shown.
+        """
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+            self.search_after_id = None
+        
         search_term = self.search_entry.get().strip()
         if not search_term:
+            # Back to the page of the list that was showing
             self.load_questions()
             return
         
-        # Clear existing items
-        for item in self.questions_tree.get_children():
-            self.questions_tree.delete(item)
+        if self.search_worker is None:
+            # Best 500 matches; a longer search term narrows them further
+            self.search_worker = question_db.SearchWorker(limit=500)
         
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT id, question, answer, category, created_date, image_path 
-            FROM questions 
-            WHERE question LIKE ? OR answer LIKE ? OR category LIKE ? 
-               OR choice_a LIKE ? OR choice_b LIKE ? OR choice_c LIKE ? OR choice_d LIKE ?
-            ORDER BY id DESC
-        """, (f"%{search_term}%", f"%{search_term}%", f"%{search_term}%", 
-              f"%{search_term}%", f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"))
-        
-        for row in cursor.fetchall():
-            question_text = row[1][:60] + "..." if len(row[1]) > 60 else row[1]
-            answer_text = f"({row[2]})"  # Show answer as (A), (B), etc.
-            image_status = "✅" if row[5] and row[5].strip() else "❌"  # Check if image exists
-            
-            self.questions_tree.insert('', tk.END, values=(
-                row[0], question_text, answer_text, row[3], image_status, row[4][:10]  # Include image status in separate column
-            ))
+        self.search_generation += 1
+        self.search_awaited = self.search_generation
+        self.search_worker.submit(self.get_current_database_path(), search_term, self.search_generation)
+        if not self.search_polling:
+            self.search_polling = True
+            self.root.after(20, self.poll_search_results)
+    
+    def poll_search_results(self):
+        """Show the newest search results once they arrive
+        
+        Polling stops once the awaited search has been answered, or when the
+        list was reloaded or the database switched since it was submitted.
+        """
+        answered = False
+        latest = None
+        try:
+            while True:
+                generation, rows = self.search_worker.results.get_nowait()
+                if generation == self.search_awaited:
+                    answered = True
+                    latest = rows
+        except queue.Empty:
+            pass
+        
+        if self.search_generation != self.search_awaited:
+            # Superseded by something other than a new search
+            self.search_polling = False
+            return
+        if answered:
+            if latest is None:
+                self.page_label.config(text="Search failed - the database may be busy with an import")
+            else:
+                self.sync_question_tree(latest)
+                self.page_label.config(text=f"{len(latest)} best matches" if len(latest) >= 500
+                                       else f"{len(latest)} matches")
+            self.prev_page_button.config(state="disabled")
+            self.next_page_button.config(state="disabled")
+            self.search_polling = False
+            return
+        self.root.after(20, self.poll_search_results)
+    
+    def show_all_questions(self):
+        """Clear the search box and list every question"""
+        self.search_entry.delete(0, tk.END)
+        self.load_questions(first_page=True)
     
     def edit_question(self):
         """Edit selected question using the add question dialog"""
@@ -1930,7 +1961,7 @@ that best answers the question or completes the statement. Show all work.
         
         # Get full question data including all choice fields
         cursor = self.conn.cursor()
-        cursor.execute("SELECT id, question, answer, category, choice_a, choice_b, choice_c, choice_d, image_path FROM questions WHERE id = ?", (question_id,))
+        cursor.execute("SELECT id, question, answer, category, choice_a, choice_b, choice_c, choice_d, image_path, image_original_path, translation_key FROM question_details WHERE id = ?", (question_id,))
         data = cursor.fetchone()
         
         if data:
@@ -1945,129 +1976,184 @@ that best answers the question or completes the statement. Show all work.
             messagebox.showerror("Error", "Please select a question to delete")
             return
         
+        if self.import_blocks_writes():
+            return
+        
         if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this question?"):
             item = self.questions_tree.item(selected[0])
             question_id = item['values'][0]
             
             cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM questions WHERE id = ?", (question_id,))
-            self.conn.commit()
+            cursor.execute("SELECT category FROM question_details WHERE id = ?", (question_id,))
+            row = cursor.fetchone()
+            try:
+                cursor.execute("DELETE FROM questions WHERE id = ?", (question_id,))
+                self.conn.commit()
+            except sqlite3.OperationalError as e:
+                self.conn.rollback()
+                messagebox.showerror("Error", f"The database is busy ({e}).\n\nPlease try again after the import finishes.")
+                return
+            self.invalidate_question_pool()
             
-            self.load_questions()
+            if row:
+                self.question_deleted(question_id, row[0])
             messagebox.showinfo("Success", "Question deleted successfully")
     
-    def load_category_settings(self):
-        """Load category settings from database with grid layout and min/max suggestions"""
-        # Clear existing widgets (all of them, not just frames)
-        for widget in self.settings_frame.winfo_children():
-            widget.destroy()
-        
-        # Get unique categories from questions with counts
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT category, COUNT(*) FROM questions GROUP BY category ORDER BY category")
-        category_data = cursor.fetchall()
-        categories = [row[0] for row in category_data]
+    def load_category_settings(self, category_counts=None):
+        """Sync the category settings panel with the database
         
-        # Create category count dictionary
-        category_counts = {row[0]: row[1] for row in category_data}
+        Widgets are kept in a registry keyed by category, so only categories
+        that appeared or disappeared are created or destroyed; the rest just
+        get their count and percentage updated in place. category_counts can
+        be passed in when they are already known (see restore_database_view).
+        """
+        try:
+            # Categories that have questions, with counts (grouped on the indexed category_id)
+            if category_counts is None:
+                category_counts = question_db.get_category_counts(self.conn)
+            
+            # Get existing settings
+            settings = question_db.get_category_percentages(self.conn)
+        except sqlite3.OperationalError as e:
+            # Held by an import with journal_mode DELETE; finish_import reloads the panel
+            print(f"Category settings not refreshed: {e}")
+            return
         
         # Store category counts as instance variable for validation
         self.category_counts = category_counts
         
-        # Get existing settings
-        cursor.execute("SELECT category, percentage FROM category_settings")
-        settings = dict(cursor.fetchall())
+        if not hasattr(self, 'category_widgets'):
+            self.category_widgets = {}  # category -> {'frame', 'label', 'suggestion', 'var', 'count', 'position'}
+            self.category_vars = {}
+            # Registered once and shared by every spinbox
+            self.validate_percentage_command = (self.root.register(self.validate_percentage_total), '%P')
+        
+        for category in [c for c in self.category_widgets if c not in category_counts]:
+            self.remove_category_widget(category)
+        
+        for category, count in category_counts.items():
+            if category in self.category_widgets:
+                self.update_category_widget(category, count)
+                var = self.category_vars[category]
+                try:
+                    current = var.get()
+                except tk.TclError:
+                    current = None
+                if current != settings.get(category, 0):
+                    var.set(settings.get(category, 0))
+            else:
+                self.add_category_widget(category, count, settings.get(category, 0))
         
-        self.category_vars = {}
+        self.layout_category_widgets()
+    
+    def add_category_widget(self, category, count, percentage=0):
+        """Create the label and percentage spinbox for one category (placed by layout_category_widgets)"""
+        # Create frame for this category
+        category_frame = ttk.Frame(self.settings_frame, padding=8)
+        
+        # Category label with question count
+        category_label = ttk.Label(category_frame, text="", width=20, anchor="w", font=("Segoe UI", 10, "bold"))
+        category_label.grid(row=0, column=0, columnspan=3, sticky="w", pady=(0, 3))
+        
+        # Percentage input frame
+        input_frame = ttk.Frame(category_frame)
+        input_frame.grid(row=1, column=0, columnspan=3, sticky="w")
+        
+        # Percentage spinbox
+        var = tk.IntVar(value=percentage)
+        spinbox = tk.Spinbox(input_frame, from_=0, to=100, width=8, textvariable=var,
+                           validate="key", validatecommand=self.validate_percentage_command,
+                           command=self.update_percentage_total)
+        spinbox.grid(row=0, column=0, padx=(0, 5))
+        
+        # Also update total when variable changes (for direct var.set() calls)
+        var.trace_add("write", lambda *args: self.update_percentage_total())
+        
+        # Percentage label
+        ttk.Label(input_frame, text="%").grid(row=0, column=1, sticky="w")
+        
+        # Maximum percentage label (in gray)
+        suggestion_label = ttk.Label(input_frame, text="", font=("Segoe UI", 9), foreground="#6c757d")
+        suggestion_label.grid(row=0, column=2, padx=(10, 0), sticky="w")
+        
+        self.category_vars[category] = var
+        self.category_widgets[category] = {'frame': category_frame, 'label': category_label,
+                                           'suggestion': suggestion_label, 'var': var,
+                                           'count': None, 'position': None}
+        self.update_category_widget(category, count)
+    
+    def update_category_widget(self, category, count):
+        """Show a new question count for a category"""
+        widgets = self.category_widgets[category]
+        if widgets['count'] == count:
+            return
+        widgets['count'] = count
+        # Max percentage: can't exceed what's available for a 50-question test
+        max_percentage = min(100, (count * 2))  # 2% per question available
+        widgets['label'].config(text=f"{category} ({count} questions):")
+        widgets['suggestion'].config(text=f"(Max: {max_percentage}%)")
+    
+    def remove_category_widget(self, category):
+        """Destroy the widgets of a category that no longer has questions"""
+        widgets = self.category_widgets.pop(category)
+        del self.category_vars[category]
+        widgets['frame'].destroy()
+    
+    def layout_category_widgets(self):
+        """Grid the categories alphabetically, 2 per row, moving only frames whose cell changed"""
+        # 2 categories per row for better readability with suggestions
+        categories_per_row = 2
+        categories = sorted(self.category_widgets)
+        
+        for i, category in enumerate(categories):
+            widgets = self.category_widgets[category]
+            position = divmod(i, categories_per_row)
+            if widgets['position'] != position:
+                widgets['frame'].grid(row=position[0], column=position[1], padx=15, pady=8, sticky="ew")
+                widgets['position'] = position
         
         if categories:
-            # Configure grid layout - 2 categories per row for better readability with suggestions
-            categories_per_row = 2
-            
-            for i, category in enumerate(categories):
-                row = i // categories_per_row
-                col = i % categories_per_row
-                
-                # Create frame for this category
-                category_frame = ttk.Frame(self.settings_frame, padding=8)
-                category_frame.grid(row=row, column=col, padx=15, pady=8, sticky="ew")
-                
-                # Calculate max percentage based on available questions
-                available_questions = category_counts[category]
-                # Max percentage: can't exceed what's available for a 50-question test
-                max_percentage = min(100, (available_questions * 2))  # 2% per question available
-                
-                # Category label with question count
-                category_label = ttk.Label(category_frame, text=f"{category} ({available_questions} questions):", 
-                                         width=20, anchor="w", font=("Segoe UI", 10, "bold"))
-                category_label.grid(row=0, column=0, columnspan=3, sticky="w", pady=(0, 3))
-                
-                # Percentage input frame
-                input_frame = ttk.Frame(category_frame)
-                input_frame.grid(row=1, column=0, columnspan=3, sticky="w")
-                
-                # Percentage spinbox
-                var = tk.IntVar(value=settings.get(category, 0))
-                self.category_vars[category] = var
-                
-                spinbox = tk.Spinbox(input_frame, from_=0, to=100, width=8, textvariable=var,
-                                   validate="key", validatecommand=(self.root.register(self.validate_percentage_total), '%P'),
-                                   command=self.update_percentage_total)
-                spinbox.grid(row=0, column=0, padx=(0, 5))
-                
-                # Also update total when variable changes (for direct var.set() calls)
-                var.trace_add("write", lambda *args: self.update_percentage_total())
-                
-                # Percentage label
-                ttk.Label(input_frame, text="%").grid(row=0, column=1, sticky="w")
-                
-                # Maximum percentage label (in gray)
-                suggestion_text = f"(Max: {max_percentage}%)"
-                suggestion_label = ttk.Label(input_frame, text=suggestion_text, 
-                                           font=("Segoe UI", 9), foreground="#6c757d")
-                suggestion_label.grid(row=0, column=2, padx=(10, 0), sticky="w")
-            
             # Configure column weights for even distribution
             for col in range(categories_per_row):
                 self.settings_frame.columnconfigure(col, weight=1)
-            
-            # Add total percentage display at the bottom
-            self.add_percentage_total_display()
-                
+            if hasattr(self, 'no_categories_label'):
+                self.no_categories_label.grid_remove()
+            
+            # Total percentage display below the last row of categories
+            rows = (len(categories) + categories_per_row - 1) // categories_per_row
+            if not hasattr(self, 'total_percentage_label'):
+                self.add_percentage_total_display()
+            self.total_separator.grid(row=rows, column=0, columnspan=2, sticky="ew", padx=15, pady=15)
+            self.total_frame.grid(row=rows + 1, column=0, columnspan=2, pady=10)
+            self.update_percentage_total()
         else:
-            # No categories message
-            no_cat_label = ttk.Label(self.settings_frame, text="No categories found. Add some questions first.", 
-                                   font=("Segoe UI", 11), foreground="#6c757d")
-            no_cat_label.grid(row=0, column=0, columnspan=3, pady=40)
-        
-        # Update scroll region after adding widgets
-        self.settings_frame.update_idletasks()
-        if hasattr(self, 'category_canvas'):
-            self.category_canvas.configure(scrollregion=self.category_canvas.bbox("all"))
+            if hasattr(self, 'total_percentage_label'):
+                self.total_separator.grid_remove()
+                self.total_frame.grid_remove()
+            if not hasattr(self, 'no_categories_label'):
+                # No categories message
+                self.no_categories_label = ttk.Label(self.settings_frame, text="No categories found. Add some questions first.",
+                                                     font=("Segoe UI", 11), foreground="#6c757d")
+            self.no_categories_label.grid(row=0, column=0, columnspan=3, pady=40)
     
     def add_percentage_total_display(self):
-        """Add a display showing current total percentage"""
+        """Add a display showing current total percentage (placed by layout_category_widgets)"""
         # Separator
-        separator = ttk.Separator(self.settings_frame, orient='horizontal')
-        separator.grid(row=999, column=0, columnspan=2, sticky="ew", padx=15, pady=15)
+        self.total_separator = ttk.Separator(self.settings_frame, orient='horizontal')
         
         # Total frame
-        total_frame = ttk.Frame(self.settings_frame, padding=10)
-        total_frame.grid(row=1000, column=0, columnspan=2, pady=10)
+        self.total_frame = ttk.Frame(self.settings_frame, padding=10)
         
         # Total label
-        ttk.Label(total_frame, text="Total Percentage:", font=("Segoe UI", 11, "bold")).pack(side=tk.LEFT)
+        ttk.Label(self.total_frame, text="Total Percentage:", font=("Segoe UI", 11, "bold")).pack(side=tk.LEFT)
         
         # Total value label (will be updated dynamically)
-        self.total_percentage_label = ttk.Label(total_frame, text="0%", font=("Segoe UI", 11, "bold"))
+        self.total_percentage_label = ttk.Label(self.total_frame, text="0%", font=("Segoe UI", 11, "bold"))
         self.total_percentage_label.pack(side=tk.LEFT, padx=(10, 0))
         
         # Status message label
-        self.total_status_label = ttk.Label(total_frame, text="", font=("Segoe UI", 10))
+        self.total_status_label = ttk.Label(self.total_frame, text="", font=("Segoe UI", 10))
         self.total_status_label.pack(side=tk.LEFT, padx=(15, 0))
-        
-        # Update the total immediately
-        self.update_percentage_total()
     
     def validate_percentage_total(self, value):
         """Validate percentage input and update total display"""
@@ -2127,6 +2213,9 @@ that best answers the question or completes the statement. Show all work.
         if not hasattr(self, 'category_vars'):
             return
         
+        if self.import_blocks_writes():
+            return
+        
         # Safely get values, treating empty strings as 0
         def safe_get(var):
             try:
@@ -2147,10 +2236,8 @@ that best answers the question or completes the statement. Show all work.
             if not messagebox.askyesno("Percentage Total Warning", message):
                 return
         
-        # Check if any category exceeds safe limits
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT category, COUNT(*) FROM questions GROUP BY category")
-        category_counts = {row[0]: row[1] for row in cursor.fetchall()}
+        # Check if any category exceeds safe limits (counts are kept current by the settings panel)
+        category_counts = self.category_counts
         
         warnings = []
         for category, var in self.category_vars.items():
@@ -2170,19 +2257,15 @@ that best answers the question or completes the statement. Show all work.
             if not messagebox.askyesno("Category Capacity Warning", warning_message):
                 return
         
-        cursor = self.conn.cursor()
-        
-        # Clear existing settings
-        cursor.execute("DELETE FROM category_settings")
-        
-        # Insert new settings
-        for category, var in self.category_vars.items():
-            percentage = safe_get(var)
-            if percentage > 0:
-                cursor.execute("INSERT INTO category_settings (category, percentage) VALUES (?, ?)",
-                             (category, percentage))
-        
-        self.conn.commit()
+        # Categories not listed (no questions) are set back to 0%
+        try:
+            question_db.save_category_percentages(
+                self.conn, {category: safe_get(var) for category, var in self.category_vars.items()})
+        except sqlite3.OperationalError as e:
+            self.conn.rollback()
+            messagebox.showerror("Error", f"The database is busy ({e}).\n\nPlease try again after the import finishes.")
+            return
+        self.invalidate_question_pool()
         messagebox.showinfo("Success", "Category settings saved")
     
     def reset_category_settings(self):
@@ -2195,109 +2278,173 @@ that best answers the question or completes the statement. Show all work.
         """Select Excel file for import"""
         filepath = filedialog.askopenfilename(
             title="Select Excel File",
-            filetypes=[("Excel files", "*.xlsx *.xls"), ("All files", "*.*")]
+            filetypes=[("Excel files", "*.xlsx *.xls"), ("CSV files", "*.csv"), ("All files", "*.*")]
         )
         
         if filepath:
             self.file_path_var.set(filepath)
     
     def import_from_excel(self):
-        """Import questions from Excel file"""
+        """Import questions from an Excel or CSV file on a background thread"""
         filepath = self.file_path_var.get()
         if not filepath:
             messagebox.showerror("Error", "Please select an Excel file")
             return
         
-        try:
-            # Clear log
-            self.import_log.delete(1.0, tk.END)
-            self.import_log.insert(tk.END, f"Starting import from: {os.path.basename(filepath)}\n")
-            
-            # Read Excel file
-            df = pd.read_excel(filepath)
-            
-            # Check required columns
-            required_cols = ['Question', 'Answer', 'Category', 'ChoiceA', 'ChoiceB', 'ChoiceC', 'ChoiceD']
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            
-            if missing_cols:
-                error_msg = f"Missing required columns: {', '.join(missing_cols)}\nFound columns: {', '.join(df.columns)}"
-                messagebox.showerror("Error", error_msg)
-                self.import_log.insert(tk.END, f"ERROR: {error_msg}\n")
-                return
-            
-            # Add ImagePath column if it doesn't exist
-            if 'ImagePath' not in df.columns:
-                df['ImagePath'] = None
-            
-            # Import questions
-            cursor = self.conn.cursor()
-            imported_count = 0
-            skipped_count = 0
-            
-            for index, row in df.iterrows():
-                question = str(row['Question']).strip()
-                answer = str(row['Answer']).strip().upper()
-                category = str(row['Category']).strip()
-                choice_a = str(row['ChoiceA']).strip()
-                choice_b = str(row['ChoiceB']).strip()
-                choice_c = str(row['ChoiceC']).strip()
-                choice_d = str(row['ChoiceD']).strip()
-                image_path = str(row['ImagePath']).strip() if pd.notna(row['ImagePath']) else None
-                
-                # Validate required fields - at least Choice A and B must be provided
-                required_fields = [question, answer, category, choice_a, choice_b]
-                if not all(required_fields) or any(val == 'nan' for val in required_fields):
-                    skipped_count += 1
-                    self.import_log.insert(tk.END, f"Row {index + 2}: Skipped (missing required data - need at least Question, Answer, Category, Choice A, and Choice B)\n")
-                    continue
-                
-                # Clean up empty choices (convert 'nan' strings to empty)
-                if choice_c == 'nan': choice_c = ''
-                if choice_d == 'nan': choice_d = ''
-                
-                # Validate that answer corresponds to a provided choice
-                valid_answers = []
-                if choice_a and choice_a != 'nan': valid_answers.append('A')
-                if choice_b and choice_b != 'nan': valid_answers.append('B')
-                if choice_c and choice_c != 'nan': valid_answers.append('C')
-                if choice_d and choice_d != 'nan': valid_answers.append('D')
-                
-                if answer not in valid_answers:
-                    skipped_count += 1
-                    self.import_log.insert(tk.END, f"Row {index + 2}: Skipped (answer '{answer}' doesn't match any provided choice)\n")
-                    continue
-                
-                try:
-                    cursor.execute("""INSERT INTO questions (question, answer, category, choice_a, choice_b, choice_c, choice_d, image_path) 
-                                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                                 (question, answer, category, choice_a, choice_b, choice_c, choice_d, image_path))
-                    imported_count += 1
-                    img_note = " [with image]" if image_path else ""
-                    self.import_log.insert(tk.END, f"Row {index + 2}: Imported - {category} (Answer: {answer}){img_note}\n")
-                except Exception as e:
-                    skipped_count += 1
-                    self.import_log.insert(tk.END, f"Row {index + 2}: Error - {str(e)}\n")
+        if getattr(self, 'import_thread', None) and self.import_thread.is_alive():
+            messagebox.showinfo("Import", "An import is already running")
+            return
+        
+        # Clear log
+        self.import_log.delete(1.0, tk.END)
+        self.import_log.insert(tk.END, f"Starting import from: {os.path.basename(filepath)}\n")
+        self.import_progress.configure(value=0, maximum=100)
+        self.import_progress_label.config(text="Reading file...")
+        self.import_cancel_button.config(state="normal")
+        
+        self.import_db_path = self.get_current_database_path()
+        self.import_queue = queue.Queue()
+        self.import_cancel = Event()
+        db_path = self.import_db_path
+        cancel_event = self.import_cancel
+        
+        def post(kind, *args):
+            self.import_queue.put((kind,) + args)
+        
+        def worker():
+            # pandas is only loaded when an import actually runs
+            import question_import
             
-            self.conn.commit()
+            # SQLite connections can't be shared between threads, so the worker opens its own
+            conn = None
+            try:
+                conn = question_db.open_database(db_path)
+                imported_count, skipped_count, duplicate_count = question_import.import_question_file(
+                    conn, filepath,
+                    progress_callback=lambda done, total, imported: post('progress', done, total, imported),
+                    log_callback=lambda lines: post('log', lines),
+                    cancel_event=cancel_event)
+                post('done', imported_count, skipped_count, duplicate_count)
+            except question_import.ImportCancelled:
+                post('cancelled')
+            except question_import.ImportFormatError as e:
+                post('format_error', str(e))
+            except Exception as e:
+                post('error', str(e))
+            finally:
+                if conn is not None:
+                    conn.close()
+        
+        self.import_thread = Thread(target=worker, daemon=True)
+        self.import_thread.start()
+        self.root.after(100, self.poll_import)
+    
+    def import_blocks_writes(self):
+        """Tell the user to wait if an import is writing to the open database
+        
+        The import holds the write lock until it commits, so edits made
+        meanwhile would fail with 'database is locked'. Returns True when the
+        caller should stop.
+        """
+        if (getattr(self, 'import_thread', None) and self.import_thread.is_alive()
+                and self.import_db_path == self.get_current_database_path()):
+            messagebox.showinfo("Import Running", "Questions are being imported into this database.\n\nPlease try again after the import finishes.")
+            return True
+        return False
+    
+    def cancel_import(self):
+        """Stop the running import before its next batch; everything it wrote is rolled back"""
+        if getattr(self, 'import_thread', None) and self.import_thread.is_alive():
+            self.import_cancel.set()
+            self.import_cancel_button.config(state="disabled")
+            self.import_progress_label.config(text="Cancelling...")
+    
+    def poll_import(self):
+        """Apply import progress and log lines posted by the worker thread"""
+        log_lines = []
+        try:
+            while True:
+                message = self.import_queue.get_nowait()
+                kind = message[0]
+                if kind == 'log':
+                    log_lines.extend(message[1])
+                elif kind == 'progress':
+                    rows_done, total_rows, imported = message[1:]
+                    if total_rows:
+                        self.import_progress.configure(value=min(100, rows_done * 100 / total_rows))
+                        self.import_progress_label.config(text=f"{rows_done} of {total_rows} rows checked, {imported} imported")
+                    else:
+                        self.import_progress_label.config(text=f"{rows_done} rows checked, {imported} imported")
+                else:
+                    self.flush_import_log(log_lines)
+                    self.finish_import(message)
+                    return
+        except queue.Empty:
+            pass
+        self.flush_import_log(log_lines)
+        self.root.after(100, self.poll_import)
+    
+    def flush_import_log(self, lines):
+        """Write buffered log lines to the import log in one insert"""
+        if lines:
+            self.import_log.insert(tk.END, "\n".join(lines) + "\n")
+            self.import_log.see(tk.END)
+    
+    def finish_import(self, message):
+        """Report the import result and show the new questions"""
+        kind = message[0]
+        self.import_cancel_button.config(state="disabled")
+        
+        if kind != 'done' and self.import_db_path == self.get_current_database_path():
+            # Nothing was added, but reads may have been turned away while the import held the database
+            if not self.searching():
+                self.load_questions()
+            self.load_category_settings()
+        
+        if kind == 'done':
+            imported_count, skipped_count, duplicate_count = message[1:]
+            self.import_progress.configure(value=100)
+            self.import_progress_label.config(text="")
             
             # Summary
             self.import_log.insert(tk.END, f"\nImport Complete:\n")
             self.import_log.insert(tk.END, f"Successfully imported: {imported_count} questions\n")
             self.import_log.insert(tk.END, f"Skipped: {skipped_count} rows\n")
-            
-            # Refresh questions and categories
-            self.load_questions()
-            self.load_category_settings()
-            
-            messagebox.showinfo("Import Complete", f"Imported {imported_count} questions successfully")
-            
-        except Exception as e:
-            messagebox.showerror("Import Error", f"Error reading Excel file: {str(e)}")
-            self.import_log.insert(tk.END, f"ERROR: {str(e)}\n")
+            self.import_log.insert(tk.END, f"Duplicates skipped: {duplicate_count} rows\n")
+            self.import_log.see(tk.END)
+            
+            # Refresh questions and categories (unless the user switched databases meanwhile)
+            if self.import_db_path == self.get_current_database_path():
+                self.invalidate_question_pool()
+                # Only the first page is loaded, so this costs the same however many were imported
+                self.load_questions(first_page=True)
+                self.load_category_settings()
+            else:
+                exam_engine.invalidate_question_pool(self.import_db_path)
+            
+            summary = f"Imported {imported_count} questions successfully"
+            if duplicate_count:
+                summary += f"\n{duplicate_count} duplicate questions were skipped"
+            messagebox.showinfo("Import Complete", summary)
+        elif kind == 'cancelled':
+            self.import_progress.configure(value=0)
+            self.import_progress_label.config(text="")
+            self.import_log.insert(tk.END, "\nImport cancelled - no questions were added.\n")
+            self.import_log.see(tk.END)
+        elif kind == 'format_error':
+            self.import_progress_label.config(text="")
+            messagebox.showerror("Error", message[1])
+            self.import_log.insert(tk.END, f"ERROR: {message[1]}\n")
+        else:
+            self.import_progress_label.config(text="")
+            messagebox.showerror("Import Error", f"Error reading Excel file: {message[1]}\n\nNo questions were added.")
+            self.import_log.insert(tk.END, f"ERROR: {message[1]}\n")
     
     def wipe_database(self):
         """Wipe all data from database with password protection"""
+        if self.import_blocks_writes():
+            return
+        
         # Password dialog
         password_window = tk.Toplevel(self.root)
         password_window.title("Database Wipe - Password Required")
@@ -2342,25 +2489,26 @@ that best answers the question or completes the statement. Show all work.
                     "Click YES to proceed with deletion."
                 )
                 
-                if final_confirm:
+                if final_confirm and not self.import_blocks_writes():
                     try:
                         cursor = self.conn.cursor()
                         
                         # Delete all questions
                         cursor.execute("DELETE FROM questions")
                         
-                        # Delete all category settings
-                        cursor.execute("DELETE FROM category_settings")
+                        # Delete all categories and their settings
+                        cursor.execute("DELETE FROM categories")
+                        cursor.execute("DELETE FROM sqlite_sequence WHERE name='categories'")
                         
                         # Reset the AUTOINCREMENT counter to start IDs back at 1
                         cursor.execute("DELETE FROM sqlite_sequence WHERE name='questions'")
                         
                         self.conn.commit()
+                        self.invalidate_question_pool()
                         
                         # Clear the questions display
                         if hasattr(self, 'questions_tree'):
-                            for item in self.questions_tree.get_children():
-                                self.questions_tree.delete(item)
+                            self.load_questions(first_page=True)
                         
                         # Clear category settings display
                         self.load_category_settings()
@@ -2369,6 +2517,9 @@ that best answers the question or completes the statement. Show all work.
                                           "Database has been completely wiped clean.\n" +
                                           "All questions and settings have been deleted.")
                         
+                    except sqlite3.OperationalError as e:
+                        self.conn.rollback()
+                        messagebox.showerror("Error", f"The database is busy ({e}).\n\nPlease try again after the import finishes.")
                     except Exception as e:
                         messagebox.showerror("Error", f"Failed to wipe database: {str(e)}")
             else:
@@ -2385,9 +2536,9 @@ that best answers the question or completes the statement. Show all work.
         ttk.Button(button_frame, text="Cancel", command=cancel_wipe).pack(side=tk.LEFT, padx=10)
     
     def __del__(self):
-        """Close database connection"""
-        if hasattr(self, 'conn'):
-            self.conn.close()
+        """Close the database connections"""
+        if hasattr(self, 'db_pool'):
+            self.db_pool.close_all()
 
 def main():
     # Auto-updater now checks version properly and only shows dialog if newer version exists
@@ -2421,4 +2572,6 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    # Required for the PDF process pool in the frozen Windows executable
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file